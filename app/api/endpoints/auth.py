@@ -2,7 +2,7 @@
 Authentication Endpoints
 OAuth2 password flow with JWT tokens
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -14,11 +14,11 @@ from ...services.user_service import UserService
 from ...core.security import (
     create_access_token,
     create_refresh_token,
-    decode_token,
-    verify_token_type
+    verify_token_type,
+    get_token_subject
 )
-from ...utils.auth import get_current_user
-from ...models.user import User
+from ...utils.auth import get_current_user, cached_decode_token
+from ...cache.user_cache import user_cache, UserSnapshot
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -41,17 +41,16 @@ async def register(
     Raises:
         HTTPException: If email or username already exists
     """
-    # Check if email exists
-    existing_user = await UserService.get_user_by_email(db, user_data.email)
-    if existing_user:
+    # Check if email or username exists in a single query
+    existing_users = await UserService.get_user_by_email_or_username(
+        db, user_data.email, user_data.username
+    )
+    if any(user.email == user_data.email for user in existing_users):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
-    # Check if username exists
-    existing_user = await UserService.get_user_by_username(db, user_data.username)
-    if existing_user:
+    if existing_users:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -60,15 +59,7 @@ async def register(
     # Create user
     user = await UserService.create_user(db, user_data)
     
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        username=user.username,
-        role=user.role.value,
-        is_active=user.is_active,
-        created_at=user.created_at,
-        updated_at=user.updated_at
-    )
+    return UserResponse.model_validate(user)
 
 
 @router.post("/login", response_model=Token)
@@ -173,7 +164,7 @@ async def refresh_token(
     Raises:
         HTTPException: If refresh token is invalid
     """
-    payload = decode_token(refresh_data.refresh_token)
+    payload = cached_decode_token(refresh_data.refresh_token)
     
     if not payload:
         raise HTTPException(
@@ -189,8 +180,8 @@ async def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id = payload.get("sub")
-    user = await UserService.get_user_by_id(db, user_id)
+    user_id = get_token_subject(payload)
+    user = await UserService.get_user_by_id(db, user_id) if user_id else None
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -214,23 +205,23 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """
     Get current authenticated user info
     
+    The serialized body is cached per user, so repeat polls skip
+    validation and JSON encoding entirely.
+    
     Args:
         current_user: Current user from token
     
     Returns:
         Current user data
     """
-    return UserResponse(
-        id=current_user.id,
-        email=current_user.email,
-        username=current_user.username,
-        role=current_user.role.value,
-        is_active=current_user.is_active,
-        created_at=current_user.created_at,
-        updated_at=current_user.updated_at
-    )
+    body = user_cache.get_response(current_user.id)
+    if body is None:
+        body = UserResponse.model_validate(current_user).model_dump_json().encode()
+        user_cache.set_response(current_user.id, body)
+    
+    return Response(content=body, media_type="application/json")
@@ -2,29 +2,79 @@
 Product Endpoints
 CRUD operations with pagination, filtering, and sorting
 """
-from typing import Optional
+from typing import Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
+import orjson
+import xxhash
 
 from ...db.database import get_db
 from ...models.schemas import (
     ProductCreate, ProductUpdate, ProductResponse,
     PaginatedResponse, PaginationParams, ProductFilter, ProductSort
 )
-from ...services.product_service import ProductService
+from ...services.product_service import ProductService, decode_cursor
 from ...utils.auth import get_current_user, get_current_admin_user
-from ...models.user import User
+from ...cache.user_cache import UserSnapshot
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+# Clients may reuse product reads briefly, then revalidate with If-None-Match
+CACHE_CONTROL = "private, max-age=30"
+
+
+def _etag(data: bytes) -> str:
+    """Build a weak ETag from the bytes that identify a representation"""
+    return f'W/"{xxhash.xxh3_64_hexdigest(data)}"'
+
+
+def _json_response(data: dict) -> Response:
+    """
+    Serialize service-built page data once, without response validation
+    
+    List pages are assembled from JSON-native values by ProductService, so
+    they are encoded directly rather than validated against
+    PaginatedResponse; the model is still published in the OpenAPI schema.
+    
+    Args:
+        data: Paginated response data
+    
+    Returns:
+        JSON response
+    """
+    return Response(content=orjson.dumps(data), media_type="application/json")
+
+
+def _conditional(request: Request, etag: str) -> Tuple[dict, Optional[Response]]:
+    """
+    Build caching headers and short-circuit matching conditional GETs
+    
+    Called before the body is serialized, so a current client copy costs
+    only a header-only 304.
+    
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+    
+    Returns:
+        Caching headers, and a 304 response if the client copy is current
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return headers, Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return headers, None
+
 
 @router.post("", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product_data: ProductCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserSnapshot = Depends(get_current_admin_user)
 ):
     """
     Create a new product (Admin only)
@@ -39,23 +89,15 @@ async def create_product(
     """
     product = await ProductService.create_product(db, product_data)
     
-    return ProductResponse(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        stock=product.stock,
-        category=product.category,
-        sku=product.sku,
-        created_at=product.created_at,
-        updated_at=product.updated_at
-    )
+    return ProductResponse.model_validate(product)
 
 
-@router.get("", response_model=PaginatedResponse)
+@router.get("", response_model=None, responses={200: {"model": PaginatedResponse}})
 async def get_products(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     name: Optional[str] = Query(None, description="Filter by name (partial match)"),
     category: Optional[str] = Query(None, description="Filter by category"),
     min_price: Optional[Decimal] = Query(None, description="Minimum price"),
@@ -69,13 +111,16 @@ async def get_products(
     Get paginated products with filtering and sorting
     
     Supports:
-    - Pagination (page, page_size)
+    - Pagination (page, page_size), or keyset by cursor for the
+      default newest-first sort
     - Filtering (name, category, price range, stock)
     - Sorting (by name, price, created_at, stock)
     
     Args:
+        request: Incoming request
         page: Page number
         page_size: Items per page
+        cursor: Keyset cursor (replaces page, which must then be omitted)
         name: Filter by name
         category: Filter by category
         min_price: Minimum price filter
@@ -86,7 +131,7 @@ async def get_products(
         db: Database session
     
     Returns:
-        Paginated list of products
+        Paginated list of products, or 304 if the client copy is current
     """
     pagination = PaginationParams(page=page, page_size=page_size)
     
@@ -100,15 +145,49 @@ async def get_products(
     
     sort = ProductSort(sort_by=sort_by, sort_order=sort_order)
     
-    return await ProductService.get_products(
+    after = None
+    if cursor:
+        # The cursor picks the page, so an explicit page would be misreported
+        if "page" in request.query_params:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Send either cursor or page, not both"
+            )
+        if sort_by != "created_at" or sort_order != "desc":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination requires the default created_at desc sort"
+            )
+        after = decode_cursor(cursor)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+    
+    products = await ProductService.get_products(
         db,
         pagination=pagination,
         filters=filters,
-        sort=sort
+        sort=sort,
+        after=after
     )
+    
+    # The page changes whenever its total or any item's updated_at does
+    etag = _etag("|".join([
+        str(products["total"]),
+        *(f"{item['id']}:{item['updated_at']}" for item in products["items"])
+    ]).encode())
+    headers, not_modified = _conditional(request, etag)
+    if not_modified:
+        return not_modified
+    
+    response = _json_response(products)
+    response.headers.update(headers)
+    return response
 
 
-@router.get("/search", response_model=PaginatedResponse)
+@router.get("/search", response_model=None, responses={200: {"model": PaginatedResponse}})
 async def search_products(
     q: str = Query(..., min_length=1, description="Search query"),
     page: int = Query(1, ge=1, description="Page number"),
@@ -129,12 +208,13 @@ async def search_products(
     """
     pagination = PaginationParams(page=page, page_size=page_size)
     
-    return await ProductService.search_products(db, q, pagination)
+    return _json_response(await ProductService.search_products(db, q, pagination))
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -142,10 +222,11 @@ async def get_product(
     
     Args:
         product_id: Product UUID
+        request: Incoming request
         db: Database session
     
     Returns:
-        Product details
+        Product JSON, or 304 if the client copy is current
     
     Raises:
         HTTPException: If product not found
@@ -158,17 +239,12 @@ async def get_product(
             detail="Product not found"
         )
     
-    return ProductResponse(
-        id=UUID(product["id"]),
-        name=product["name"],
-        description=product["description"],
-        price=Decimal(str(product["price"])),
-        stock=product["stock"],
-        category=product["category"],
-        sku=product["sku"],
-        created_at=product["created_at"],
-        updated_at=product["updated_at"]
-    )
+    headers, not_modified = _conditional(request, _etag(product))
+    if not_modified:
+        return not_modified
+    
+    # Already serialized as ProductResponse, send it without re-validation
+    return Response(content=product, media_type="application/json", headers=headers)
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
@@ -176,7 +252,7 @@ async def update_product(
     product_id: UUID,
     update_data: ProductUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserSnapshot = Depends(get_current_admin_user)
 ):
     """
     Update product (Admin only)
@@ -201,24 +277,14 @@ async def update_product(
             detail="Product not found"
         )
     
-    return ProductResponse(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        stock=product.stock,
-        category=product.category,
-        sku=product.sku,
-        created_at=product.created_at,
-        updated_at=product.updated_at
-    )
+    return ProductResponse.model_validate(product)
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
     product_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserSnapshot = Depends(get_current_admin_user)
 ):
     """
     Soft delete product (Admin only)
@@ -3,60 +3,48 @@ User Management Endpoints
 Admin-only endpoints for user management
 """
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...db.database import get_db
-from ...models.schemas import UserResponse, UserUpdate
+from ...models.schemas import UserResponse, UserUpdate, PaginatedResponse, PaginationParams
 from ...models.user import UserRole
 from ...services.user_service import UserService
 from ...utils.auth import get_current_admin_user, get_current_user
-from ...models.user import User
+from ...cache.user_cache import UserSnapshot
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.get("", response_model=list[UserResponse])
+@router.get("", response_model=PaginatedResponse)
 async def get_users(
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserSnapshot = Depends(get_current_admin_user)
 ):
     """
-    Get all users (Admin only)
+    Get paginated users (Admin only)
     
     Args:
+        page: Page number
+        page_size: Items per page
         db: Database session
         current_user: Current admin user
     
     Returns:
-        List of all users
+        Paginated list of users
     """
-    from sqlalchemy import select
-    
-    result = await db.execute(
-        select(User).where(User.is_deleted == False)
-    )
-    users = result.scalars().all()
-    
-    return [
-        UserResponse(
-            id=u.id,
-            email=u.email,
-            username=u.username,
-            role=u.role.value,
-            is_active=u.is_active,
-            created_at=u.created_at,
-            updated_at=u.updated_at
-        )
-        for u in users
-    ]
+    pagination = PaginationParams(page=page, page_size=page_size)
+    
+    return await UserService.get_users(db, pagination)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """
     Get user by ID
@@ -76,13 +64,13 @@ async def get_user(
         HTTPException: If user not found or not authorized
     """
     # Check authorization
-    if current_user.role != UserRole.ADMIN and str(current_user.id) != str(user_id):
+    if current_user.role != UserRole.ADMIN and current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this user"
         )
     
-    user = await UserService.get_user_by_id(db, str(user_id))
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -90,15 +78,7 @@ async def get_user(
             detail="User not found"
         )
     
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        username=user.username,
-        role=user.role.value,
-        is_active=user.is_active,
-        created_at=user.created_at,
-        updated_at=user.updated_at
-    )
+    return UserResponse.model_validate(user)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -106,7 +86,7 @@ async def update_user(
     user_id: UUID,
     update_data: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """
     Update user
@@ -127,13 +107,13 @@ async def update_user(
         HTTPException: If user not found or not authorized
     """
     # Check authorization
-    if current_user.role != UserRole.ADMIN and str(current_user.id) != str(user_id):
+    if current_user.role != UserRole.ADMIN and current_user.id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this user"
         )
     
-    user = await UserService.get_user_by_id(db, str(user_id))
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -143,22 +123,14 @@ async def update_user(
     
     updated_user = await UserService.update_user(db, user, update_data)
     
-    return UserResponse(
-        id=updated_user.id,
-        email=updated_user.email,
-        username=updated_user.username,
-        role=updated_user.role.value,
-        is_active=updated_user.is_active,
-        created_at=updated_user.created_at,
-        updated_at=updated_user.updated_at
-    )
+    return UserResponse.model_validate(updated_user)
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: UUID,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserSnapshot = Depends(get_current_admin_user)
 ):
     """
     Soft delete user (Admin only)
@@ -171,7 +143,7 @@ async def delete_user(
     Raises:
         HTTPException: If user not found
     """
-    user = await UserService.get_user_by_id(db, str(user_id))
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -189,7 +161,7 @@ async def update_user_role(
     user_id: UUID,
     role: UserRole,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserSnapshot = Depends(get_current_admin_user)
 ):
     """
     Update user role (Admin only)
@@ -206,7 +178,7 @@ async def update_user_role(
     Raises:
         HTTPException: If user not found
     """
-    user = await UserService.get_user_by_id(db, str(user_id))
+    user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -216,12 +188,4 @@ async def update_user_role(
     
     updated_user = await UserService.update_role(db, user, role)
     
-    return UserResponse(
-        id=updated_user.id,
-        email=updated_user.email,
-        username=updated_user.username,
-        role=updated_user.role.value,
-        is_active=updated_user.is_active,
-        created_at=updated_user.created_at,
-        updated_at=updated_user.updated_at
-    )
+    return UserResponse.model_validate(updated_user)
@@ -4,6 +4,8 @@ Exports Redis client and cache services
 """
 from .redis_client import redis_client, get_redis, RedisClient
 from .cache_service import product_cache, ProductCacheService
+from .memory_cache import TTLCache
+from .user_cache import user_cache, UserCacheService, UserSnapshot
 
 __all__ = [
     "redis_client",
@@ -11,4 +13,8 @@ __all__ = [
     "RedisClient",
     "product_cache",
     "ProductCacheService",
+    "TTLCache",
+    "user_cache",
+    "UserCacheService",
+    "UserSnapshot",
 ]
@@ -2,10 +2,20 @@
 Product Cache Service
 Handles caching logic for product operations
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from .redis_client import redis_client
-from ..core.config import settings
-import json
+from .memory_cache import TTLCache
+import orjson
+import xxhash
+
+PREFIX = "products"
+
+# Key prefixes are built once rather than on every key computation
+_LIST_PREFIX = f"{PREFIX}:list:"
+_DETAIL_PREFIX = f"{PREFIX}:body:"
+_SEARCH_PREFIX = f"{PREFIX}:search:"
+_COUNT_PREFIX = f"{PREFIX}:count:"
+_GENERATION_PREFIX = f"{PREFIX}:gen:"
 
 
 class ProductCacheService:
@@ -13,47 +23,86 @@ class ProductCacheService:
     Service for caching product data
     
     Cache Keys:
-    - products:list:{page}:{page_size}:{filters_hash} - Paginated product lists
-    - products:detail:{product_id} - Individual product details
-    - products:search:{query_hash} - Search results
+    - products:list:{gen}:{page}:{page_size}:{filters_hash} - Paginated product lists
+    - products:body:{product_id} - Serialized product detail responses
+    - products:search:{gen}:{query_hash}:{page}:{page_size} - Search results
+    - products:count:{gen}:{filters_hash} - Filtered product counts
+    - products:gen:{list|search} - Generation counters for list/search keys
+    
+    List and search entries are invalidated by bumping their generation
+    counter, so stale entries are never read again and expire via TTL.
+    Each worker reuses a fetched generation for GENERATION_TTL seconds.
+    
+    Counts are keyed by filters only (not page or sort), so every page of
+    a listing shares one COUNT for up to COUNT_TTL seconds.
     """
     
-    PREFIX = "products"
+    PREFIX = PREFIX
+    GENERATION_TTL = 1
+    COUNT_TTL = 30
+    
+    def __init__(self):
+        self._generations = TTLCache(maxsize=8, ttl=self.GENERATION_TTL)
     
     @staticmethod
-    def _list_key(page: int, page_size: int, filters_hash: str = "all") -> str:
+    def _list_key(gen: int, page: int, page_size: int, filters_hash: str = "all") -> str:
         """Generate cache key for product list"""
-        return f"{ProductCacheService.PREFIX}:list:{page}:{page_size}:{filters_hash}"
+        return f"{_LIST_PREFIX}{gen}:{page}:{page_size}:{filters_hash}"
+    
+    @staticmethod
+    def _count_key(gen: int, filters_hash: str = "all") -> str:
+        """Generate cache key for filtered product count"""
+        return f"{_COUNT_PREFIX}{gen}:{filters_hash}"
+    
+    @staticmethod
+    def _generation_key(kind: str) -> str:
+        """Generate key for a list/search generation counter"""
+        return f"{_GENERATION_PREFIX}{kind}"
     
     @staticmethod
     def _detail_key(product_id: str) -> str:
         """Generate cache key for product detail"""
-        return f"{ProductCacheService.PREFIX}:detail:{product_id}"
+        return f"{_DETAIL_PREFIX}{product_id}"
     
     @staticmethod
-    def _search_key(query: str, page: int, page_size: int) -> str:
+    def _search_key(gen: int, query: str, page: int, page_size: int) -> str:
         """Generate cache key for search results"""
-        import hashlib
-        query_hash = hashlib.md5(query.encode()).hexdigest()[:8]
-        return f"{ProductCacheService.PREFIX}:search:{query_hash}:{page}:{page_size}"
+        query_hash = xxhash.xxh3_64_hexdigest(query.encode())
+        return f"{_SEARCH_PREFIX}{gen}:{query_hash}:{page}:{page_size}"
+    
+    async def _generation(self, kind: str) -> int:
+        """
+        Get current generation for list or search keys
+        
+        Args:
+            kind: "list" or "search"
+        
+        Returns:
+            Generation number (0 if never invalidated or Redis unavailable)
+        """
+        gen = self._generations.get(kind)
+        if gen is None:
+            gen = await redis_client.get(self._generation_key(kind)) or 0
+            self._generations.set(kind, gen)
+        return gen
     
-    async def get_product_list(self, page: int, page_size: int, filters: Optional[Dict] = None) -> Optional[Dict]:
+    async def get_product_list(self, page: int, page_size: int, filters: Tuple = ()) -> Optional[Dict]:
         """
         Get cached product list
         
         Args:
             page: Page number
             page_size: Items per page
-            filters: Applied filters
+            filters: Cache key tuple of applied filters
         
         Returns:
             Cached data or None
         """
-        filters_hash = self._hash_filters(filters or {})
-        key = self._list_key(page, page_size, filters_hash)
+        filters_hash = self._hash_filters(filters)
+        key = self._list_key(await self._generation("list"), page, page_size, filters_hash)
         return await redis_client.get(key)
     
-    async def set_product_list(self, page: int, page_size: int, data: Dict, filters: Optional[Dict] = None) -> bool:
+    async def set_product_list(self, page: int, page_size: int, data: Dict, filters: Tuple = ()) -> bool:
         """
         Cache product list
         
@@ -61,16 +110,45 @@ class ProductCacheService:
             page: Page number
             page_size: Items per page
             data: Data to cache
-            filters: Applied filters
+            filters: Cache key tuple of applied filters
         
         Returns:
             Success status
         """
-        filters_hash = self._hash_filters(filters or {})
-        key = self._list_key(page, page_size, filters_hash)
+        filters_hash = self._hash_filters(filters)
+        key = self._list_key(await self._generation("list"), page, page_size, filters_hash)
         return await redis_client.set(key, data)
     
-    async def get_product_detail(self, product_id: str) -> Optional[Dict]:
+    async def get_product_count(self, filters: Tuple = ()) -> Optional[int]:
+        """
+        Get cached product count for filters
+        
+        Args:
+            filters: Cache key tuple of applied filters
+        
+        Returns:
+            Cached count or None
+        """
+        filters_hash = self._hash_filters(filters)
+        key = self._count_key(await self._generation("list"), filters_hash)
+        return await redis_client.get(key)
+    
+    async def set_product_count(self, total: int, filters: Tuple = ()) -> bool:
+        """
+        Cache product count for filters
+        
+        Args:
+            total: Number of matching products
+            filters: Cache key tuple of applied filters
+        
+        Returns:
+            Success status
+        """
+        filters_hash = self._hash_filters(filters)
+        key = self._count_key(await self._generation("list"), filters_hash)
+        return await redis_client.set(key, total, expire=self.COUNT_TTL)
+    
+    async def get_product_detail(self, product_id: str) -> Optional[bytes]:
         """
         Get cached product detail
         
@@ -78,24 +156,24 @@ class ProductCacheService:
             product_id: Product UUID
         
         Returns:
-            Cached data or None
+            Serialized response body or None
         """
         key = self._detail_key(product_id)
-        return await redis_client.get(key)
+        return await redis_client.get_raw(key)
     
-    async def set_product_detail(self, product_id: str, data: Dict) -> bool:
+    async def set_product_detail(self, product_id: str, body: bytes) -> bool:
         """
         Cache product detail
         
         Args:
             product_id: Product UUID
-            data: Data to cache
+            body: Serialized response body
         
         Returns:
             Success status
         """
         key = self._detail_key(product_id)
-        return await redis_client.set(key, data)
+        return await redis_client.set_raw(key, body)
     
     async def get_search_results(self, query: str, page: int, page_size: int) -> Optional[Dict]:
         """
@@ -109,7 +187,7 @@ class ProductCacheService:
         Returns:
             Cached data or None
         """
-        key = self._search_key(query, page, page_size)
+        key = self._search_key(await self._generation("search"), query, page, page_size)
         return await redis_client.get(key)
     
     async def set_search_results(self, query: str, page: int, page_size: int, data: Dict) -> bool:
@@ -125,7 +203,7 @@ class ProductCacheService:
         Returns:
             Success status
         """
-        key = self._search_key(query, page, page_size)
+        key = self._search_key(await self._generation("search"), query, page, page_size)
         return await redis_client.set(key, data)
     
     async def invalidate_product(self, product_id: str) -> None:
@@ -135,41 +213,35 @@ class ProductCacheService:
         Args:
             product_id: Product UUID
         """
-        # Delete product detail cache
-        await redis_client.delete(self._detail_key(product_id))
-        
-        # Invalidate all list caches
-        await redis_client.delete_pattern(f"{self.PREFIX}:list:*")
-        
-        # Invalidate all search caches
-        await redis_client.delete_pattern(f"{self.PREFIX}:search:*")
+        # Delete product detail cache and bump list/search generations
+        # in a single round-trip
+        async with redis_client.pipeline() as pipe:
+            if pipe is not None:
+                pipe.unlink(self._detail_key(product_id))
+                pipe.incr(self._generation_key("list"))
+                pipe.incr(self._generation_key("search"))
+        
+        # Pick up the new generations on the next read in this worker
+        self._generations.clear()
     
     async def invalidate_all_lists(self) -> None:
-        """Invalidate all list and search caches"""
-        await redis_client.delete_pattern(f"{self.PREFIX}:list:*")
-        await redis_client.delete_pattern(f"{self.PREFIX}:search:*")
+        """Invalidate all list and search caches by bumping their generations"""
+        async with redis_client.pipeline() as pipe:
+            if pipe is not None:
+                pipe.incr(self._generation_key("list"))
+                pipe.incr(self._generation_key("search"))
+        
+        self._generations.clear()
     
     @staticmethod
-    def _hash_filters(filters: Dict) -> str:
-        """Generate hash from filter dictionary"""
+    def _hash_filters(filters: Tuple) -> str:
+        """Generate hash from a tuple of filter values"""
         if not filters:
             return "all"
-        import hashlib
-        from decimal import Decimal
-        
-        # Convert Decimal to float for JSON serialization
-        def convert_decimals(obj):
-            if isinstance(obj, dict):
-                return {k: convert_decimals(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_decimals(v) for v in obj]
-            elif isinstance(obj, Decimal):
-                return float(obj)
-            return obj
-        
-        serializable_filters = convert_decimals(filters)
-        filter_str = json.dumps(serializable_filters, sort_keys=True)
-        return hashlib.md5(filter_str.encode()).hexdigest()[:8]
+        
+        # Decimal values are not JSON-native, so orjson hands them to float
+        filter_bytes = orjson.dumps(filters, default=float)
+        return xxhash.xxh3_64_hexdigest(filter_bytes)
 
 
 # Global cache service instance
@@ -0,0 +1,62 @@
+"""
+In-Process TTL Cache
+Small per-worker cache for hot values that are too cheap to send to Redis
+"""
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache with per-entry expiry
+    
+    Features:
+    - Per-entry TTL based on a monotonic clock
+    - Expired entries are dropped lazily on access
+    - Oldest entry is evicted when the cache is full
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get value from cache, or None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Set value in cache, capped at the cache TTL"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            # Dicts keep insertion order, so the first key is the oldest
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (value, time.monotonic() + ttl)
+    
+    def ttl_left(self, key: Hashable) -> float:
+        """Get seconds until key expires, or 0 if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return 0.0
+        return max(entry[1] - time.monotonic(), 0.0)
+    
+    def delete(self, key: Hashable) -> None:
+        """Delete key from cache"""
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Clear all entries"""
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
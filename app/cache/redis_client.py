@@ -2,10 +2,12 @@
 Redis Cache Client
 Handles caching operations with connection pooling
 """
-import json
-from typing import Optional, Any, List
+from contextlib import asynccontextmanager
+from typing import Optional, Any, List, AsyncIterator
+import orjson
 import redis.asyncio as redis
-from ..core.config import settings
+from redis.asyncio.client import Pipeline
+from ..core.config import get_settings
 
 
 class RedisClient:
@@ -14,11 +16,13 @@ class RedisClient:
     
     Features:
     - Async operations
-    - JSON serialization
+    - JSON serialization (values stored as raw orjson bytes)
     - Connection pooling
     - Graceful failure when Redis is unavailable
     """
     
+    SCAN_BATCH_SIZE = 500
+    
     def __init__(self):
         self._client: Optional[redis.Redis] = None
         self._connected: bool = False
@@ -27,9 +31,9 @@ class RedisClient:
         """Establish Redis connection"""
         try:
             self._client = redis.from_url(
-                settings.REDIS_URL,
+                get_settings().REDIS_URL,
                 encoding="utf-8",
-                decode_responses=True
+                decode_responses=False
             )
             # Test connection
             await self._client.ping()
@@ -54,6 +58,24 @@ class RedisClient:
         """Get Redis client instance"""
         return self._client if self._connected else None
     
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[Optional[Pipeline]]:
+        """
+        Queue commands on a non-transactional pipeline
+        
+        Queued commands are sent in a single round-trip when the block
+        exits. Yields None when Redis is unavailable.
+        """
+        if not self._connected or not self._client:
+            yield None
+            return
+        pipe = self._client.pipeline(transaction=False)
+        yield pipe
+        try:
+            await pipe.execute()
+        except:
+            pass
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         if not self._connected or not self._client:
@@ -61,10 +83,11 @@ class RedisClient:
         try:
             value = await self._client.get(key)
             if value:
+                # orjson parses the reply bytes directly, no str round-trip
                 try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return value
+                    return orjson.loads(value)
+                except orjson.JSONDecodeError:
+                    return value.decode()
         except:
             pass
         return None
@@ -75,8 +98,27 @@ class RedisClient:
             return False
         try:
             if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            expire = expire or settings.CACHE_EXPIRE_SECONDS
+                value = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+            expire = expire or get_settings().CACHE_EXPIRE_SECONDS
+            return await self._client.set(key, value, ex=expire)
+        except:
+            return False
+    
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """Get stored bytes from cache without decoding"""
+        if not self._connected or not self._client:
+            return None
+        try:
+            return await self._client.get(key)
+        except:
+            return None
+    
+    async def set_raw(self, key: str, value: bytes, expire: Optional[int] = None) -> bool:
+        """Set bytes in cache as-is"""
+        if not self._connected or not self._client:
+            return False
+        try:
+            expire = expire or get_settings().CACHE_EXPIRE_SECONDS
             return await self._client.set(key, value, ex=expire)
         except:
             return False
@@ -91,13 +133,26 @@ class RedisClient:
             return False
     
     async def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+        """
+        Delete all keys matching pattern
+        
+        Uses incremental SCAN instead of the blocking KEYS command, and
+        UNLINK so Redis frees memory in a background thread. Unlinks are
+        queued in batches on a single pipeline round-trip.
+        """
         if not self._connected or not self._client:
             return 0
         try:
-            keys = await self._client.keys(pattern)
-            if keys:
-                return await self._client.delete(*keys)
+            pipe = self._client.pipeline(transaction=False)
+            batch: List[bytes] = []
+            async for key in self._client.scan_iter(match=pattern, count=self.SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= self.SCAN_BATCH_SIZE:
+                    pipe.unlink(*batch)
+                    batch = []
+            if batch:
+                pipe.unlink(*batch)
+            return sum(await pipe.execute())
         except:
             pass
         return 0
@@ -111,6 +166,15 @@ class RedisClient:
         except:
             return False
     
+    async def incr(self, key: str) -> Optional[int]:
+        """Atomically increment integer key, returning the new value"""
+        if not self._connected or not self._client:
+            return None
+        try:
+            return await self._client.incr(key)
+        except:
+            return None
+    
     async def expire(self, key: str, seconds: int) -> bool:
         """Set expiration on key"""
         if not self._connected or not self._client:
@@ -0,0 +1,184 @@
+"""
+User Cache Service
+Short-lived cache of authenticated users, per worker and shared in Redis
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+from .memory_cache import TTLCache
+from .redis_client import redis_client
+from ..models.user import User, UserRole
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    Detached, read-only copy of a User row
+    
+    Safe to share between requests because it is not bound to any session.
+    """
+    id: UUID
+    email: str
+    username: str
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        """Build snapshot from ORM user"""
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            role=user.role,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+    
+    @classmethod
+    def from_cache(cls, data: Dict[str, Any]) -> "UserSnapshot":
+        """Build snapshot from its cached JSON form"""
+        return cls(
+            id=UUID(data["id"]),
+            email=data["email"],
+            username=data["username"],
+            role=UserRole(data["role"]),
+            is_active=data["is_active"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            updated_at=datetime.fromisoformat(data["updated_at"])
+        )
+    
+    def to_cache(self) -> Dict[str, Any]:
+        """Get JSON-serializable form for Redis"""
+        return {
+            "id": str(self.id),
+            "email": self.email,
+            "username": self.username,
+            "role": self.role.value,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+    
+    @property
+    def is_admin(self) -> bool:
+        """Check if user has admin role"""
+        return self.role == UserRole.ADMIN
+
+
+class UserCacheService:
+    """
+    Service for caching current-user lookups
+    
+    Snapshots live for REDIS_TTL seconds in Redis, so a worker that has not
+    seen a user yet still skips the user SELECT. Changes delete the Redis
+    entry at flush, but the request commits later, so a concurrent miss can
+    put the old row back. Each Redis entry carries its expiry time, and a
+    worker keeps its copy only for the time the entry has left. Serialized
+    /auth/me bodies expire with the snapshot they were built from. A stale
+    role or active flag is therefore served for at most REDIS_TTL seconds
+    after a change.
+    """
+    
+    TTL = 5
+    REDIS_TTL = TTL
+    
+    def __init__(self):
+        self._users = TTLCache(maxsize=1024, ttl=self.TTL)
+        self._responses = TTLCache(maxsize=1024, ttl=self.TTL)
+    
+    @staticmethod
+    def _redis_key(user_id: str) -> str:
+        """Get Redis key for user snapshot"""
+        return f"auth:user:{user_id}"
+    
+    async def get_user(self, user_id: str) -> Optional[UserSnapshot]:
+        """
+        Get cached user snapshot, from this worker or from Redis
+        
+        Args:
+            user_id: User UUID
+        
+        Returns:
+            Cached snapshot or None
+        """
+        key = str(user_id)
+        snapshot = self._users.get(key)
+        if snapshot is not None:
+            return snapshot
+        
+        data = await redis_client.get(self._redis_key(key))
+        if not isinstance(data, dict):
+            return None
+        
+        try:
+            snapshot = UserSnapshot.from_cache(data)
+            ttl = float(data.get("expires_at", 0)) - time.time()
+        except (KeyError, TypeError, ValueError):
+            return None
+        
+        # Keep it no longer than the Redis entry, so staleness does not stack
+        self._users.set(key, snapshot, ttl=ttl)
+        return snapshot
+    
+    async def set_user(self, user: User) -> UserSnapshot:
+        """
+        Cache snapshot of user in this worker and in Redis
+        
+        Args:
+            user: User instance
+        
+        Returns:
+            Cached snapshot
+        """
+        snapshot = UserSnapshot.from_user(user)
+        key = str(snapshot.id)
+        self._users.set(key, snapshot)
+        data = snapshot.to_cache()
+        data["expires_at"] = time.time() + self.REDIS_TTL
+        await redis_client.set(self._redis_key(key), data, expire=self.REDIS_TTL)
+        return snapshot
+    
+    def get_response(self, user_id: str) -> Optional[bytes]:
+        """
+        Get cached serialized user response
+        
+        Args:
+            user_id: User UUID
+        
+        Returns:
+            JSON body or None
+        """
+        return self._responses.get(str(user_id))
+    
+    def set_response(self, user_id: str, body: bytes) -> None:
+        """
+        Cache serialized user response until its snapshot expires
+        
+        Args:
+            user_id: User UUID
+            body: JSON body
+        """
+        key = str(user_id)
+        self._responses.set(key, body, ttl=self._users.ttl_left(key))
+    
+    async def invalidate_user(self, user_id: str) -> None:
+        """
+        Invalidate cached snapshot and response for a user
+        
+        Args:
+            user_id: User UUID
+        """
+        key = str(user_id)
+        self._users.delete(key)
+        self._responses.delete(key)
+        await redis_client.delete(self._redis_key(key))
+
+
+# Global user cache service instance
+user_cache = UserCacheService()
@@ -2,23 +2,26 @@
 Core Package
 Exports configuration and security utilities
 """
-from .config import settings, get_settings
+from .config import get_settings
 from .security import (
     verify_password,
     get_password_hash,
+    password_needs_rehash,
     create_access_token,
     create_refresh_token,
     decode_token,
-    verify_token_type
+    verify_token_type,
+    get_token_subject
 )
 
 __all__ = [
-    "settings",
     "get_settings",
     "verify_password",
     "get_password_hash",
+    "password_needs_rehash",
     "create_access_token",
     "create_refresh_token",
     "decode_token",
     "verify_token_type",
+    "get_token_subject",
 ]
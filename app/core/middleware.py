@@ -4,10 +4,9 @@ Logging and error handling middleware
 """
 import time
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+import orjson
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Configure logging
 logging.basicConfig(
@@ -17,67 +16,112 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """
     Middleware for request/response logging
     
     Logs:
     - Request method, path, and query params
     - Response status code and processing time
+    
+    Implemented as pure ASGI so requests are not bridged through
+    BaseHTTPMiddleware's task group and Request/Response objects.
     """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Log request
-        start_time = time.time()
-        
-        logger.info(
-            f"Request: {request.method} {request.url.path} "
-            f"Query: {dict(request.query_params)}"
-        )
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         
-        # Process request
-        response = await call_next(request)
+        # Log request
+        start_time = time.perf_counter_ns()
+        method = scope["method"]
+        path = scope["path"]
         
-        # Calculate processing time
-        process_time = (time.time() - start_time) * 1000
+        # Checked per request (logging caches the answer), so level changes
+        # still apply; skips building log arguments when INFO is filtered
+        log_info = logger.isEnabledFor(logging.INFO)
         
-        # Log response
-        logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"Status: {response.status_code} "
-            f"Time: {process_time:.2f}ms"
-        )
+        if log_info:
+            # Raw query string, decoded only for the log line
+            logger.info(
+                "Request: %s %s Query: %s",
+                method, path, scope.get("query_string", b"").decode("latin-1")
+            )
         
-        # Add timing header
-        response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Calculate processing time in whole milliseconds
+                process_ms = (time.perf_counter_ns() - start_time) // 1_000_000
+                
+                # Log response
+                if log_info:
+                    logger.info(
+                        "Response: %s %s Status: %d Time: %dms",
+                        method, path, message["status"], process_ms
+                    )
+                
+                # Add timing header
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", f"{process_ms}ms")
+            await send(message)
         
-        return response
+        # Process request
+        await self.app(scope, receive, send_wrapper)
 
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
+class ErrorHandlingMiddleware:
     """
     Global error handling middleware
     
     Catches unhandled exceptions and returns consistent error responses
     """
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
             logger.error(
-                f"Unhandled exception on {request.method} {request.url.path}: "
+                f"Unhandled exception on {scope['method']} {scope['path']}: "
                 f"{str(exc)}",
                 exc_info=True
             )
             
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "detail": "Internal server error",
-                    "error": str(exc) if logger.level == logging.DEBUG else None
-                }
-            )
+            # Too late for an error response once headers are out
+            if response_started:
+                raise
+            
+            body = orjson.dumps({
+                "detail": "Internal server error",
+                "error": str(exc) if logger.level == logging.DEBUG else None
+            })
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
 
 
 class CORSMiddleware:
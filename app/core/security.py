@@ -2,26 +2,59 @@
 Security Module
 Handles password hashing, JWT token creation and validation
 """
+import hmac
 from datetime import datetime, timedelta
+from functools import cache
 from typing import Optional, Dict, Any
+from uuid import UUID
 from jose import jwt, JWTError
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import InvalidHashError, VerificationError
 import bcrypt
-from .config import settings
+from .config import get_settings
+
+
+# Hashes created before the switch to Argon2id
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+
+@cache
+def _password_hasher() -> PasswordHasher:
+    """Get Argon2id hasher built from the configured cost parameters"""
+    settings = get_settings()
+    return PasswordHasher(
+        time_cost=settings.PASSWORD_HASH_TIME_COST,
+        memory_cost=settings.PASSWORD_HASH_MEMORY_KIB,
+        parallelism=settings.PASSWORD_HASH_PARALLELISM,
+        type=Type.ID
+    )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password"""
-    password_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    """Verify a plain password against an Argon2id or legacy bcrypt hash"""
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        password_bytes = plain_password.encode('utf-8')
+        hashed_bytes = hashed_password.encode('utf-8')
+        return bcrypt.checkpw(password_bytes, hashed_bytes)
+    try:
+        return _password_hasher().verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
 
 
 def get_password_hash(password: str) -> str:
-    """Generate hash from plain password"""
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+    """Generate Argon2id hash from plain password"""
+    return _password_hasher().hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check if hash is legacy bcrypt or uses outdated Argon2 parameters"""
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        return True
+    try:
+        return _password_hasher().check_needs_rehash(hashed_password)
+    except InvalidHashError:
+        return True
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -35,6 +68,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     Returns:
         Encoded JWT token string
     """
+    settings = get_settings()
     to_encode = data.copy()
     
     if expires_delta:
@@ -61,6 +95,7 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     Returns:
         Encoded JWT refresh token string
     """
+    settings = get_settings()
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
@@ -83,6 +118,7 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Decoded payload or None if invalid
     """
+    settings = get_settings()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
@@ -101,4 +137,23 @@ def verify_token_type(payload: Dict[str, Any], expected_type: str) -> bool:
     Returns:
         True if type matches, False otherwise
     """
-    return payload.get("type") == expected_type
\ No newline at end of file
+    token_type = payload.get("type")
+    if not isinstance(token_type, str):
+        return False
+    return hmac.compare_digest(token_type.encode(), expected_type.encode())
+
+
+def get_token_subject(payload: Dict[str, Any]) -> Optional[UUID]:
+    """
+    Get user ID from token payload
+    
+    Args:
+        payload: Decoded token payload
+    
+    Returns:
+        User UUID or None if missing or malformed
+    """
+    try:
+        return UUID(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        return None
\ No newline at end of file
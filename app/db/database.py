@@ -4,7 +4,9 @@ Async SQLAlchemy setup with connection pooling
 """
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from app.core.config import settings
+from app.core.config import get_settings
+
+settings = get_settings()
 
 # Create async engine with SQLite-compatible settings
 engine_args = {
@@ -15,10 +17,20 @@ engine_args = {
 if "sqlite" not in settings.DATABASE_URL:
     engine_args.update({
         "pool_pre_ping": True,
-        "pool_size": 10,
-        "max_overflow": 20
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS
     })
 
+# Cache prepared statements per connection so recurring queries skip
+# parse/plan, and disable JIT which only slows down small OLTP queries
+if "asyncpg" in settings.DATABASE_URL:
+    engine_args["connect_args"] = {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": {"jit": "off"}
+    }
+
 engine = create_async_engine(settings.DATABASE_URL, **engine_args)
 
 # Create async session factory
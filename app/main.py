@@ -1,17 +1,24 @@
 """
 FastAPI Application Entry Point
 Main application with middleware and lifecycle events
+
+Request logging is done once, by LoggingMiddleware; the server's own
+access log and proxy-header middleware are turned off.
 """
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from app.core.config import settings
+from app.core.config import get_settings
 from app.core.middleware import LoggingMiddleware, ErrorHandlingMiddleware
+from app.utils.middleware import JWTMiddleware
 from app.api.router import api_router
 from app.db.database import init_db, close_db
 from app.cache.redis_client import redis_client
 
+settings = get_settings()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -84,6 +91,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Decode bearer tokens once, ahead of dependency resolution
+app.add_middleware(JWTMiddleware)
+
+# Compress large JSON bodies (product lists); sits inside LoggingMiddleware
+# so logged timings include compression
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(ErrorHandlingMiddleware)
 
@@ -118,5 +131,10 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
+        # C-accelerated event loop and HTTP parser from uvicorn[standard]
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        proxy_headers=False,
         reload=settings.DEBUG
     )
@@ -4,7 +4,7 @@ Provides UUID primary key, timestamps, and soft delete functionality
 """
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import Column, DateTime, Boolean, String
+from sqlalchemy import Column, DateTime, Boolean, Uuid
 from sqlalchemy.orm import declared_attr
 from app.db.database import Base
 
@@ -14,13 +14,13 @@ class BaseModel(Base):
     Abstract base model with common fields
     
     Features:
-    - UUID primary key (stored as String for SQLite compatibility)
+    - UUID primary key (native UUID on PostgreSQL, CHAR(32) on SQLite)
     - Created/Updated timestamps
     - Soft delete support
     """
     __abstract__ = True
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid4()), index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid4, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     is_deleted = Column(Boolean, default=False, nullable=False, index=True)
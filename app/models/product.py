@@ -3,17 +3,42 @@
 Product Model
 Represents products with UUID, pricing, and inventory management
 """
-from sqlalchemy import Column, String, Text, Numeric, Integer
+from sqlalchemy import Column, String, Text, Numeric, Integer, Index, func, text
 from decimal import Decimal
 from uuid import uuid4
 from .base import BaseModel
 
+_ALIVE = text("is_deleted = false")
+
+# Text search configuration, inlined so the index expression matches queries
+SEARCH_CONFIG = text("'simple'::regconfig")
+
 
 class Product(BaseModel):
     """
     Product model for inventory management
     """
     __tablename__ = "products"
+    __table_args__ = (
+        # Partial indexes over live rows matching the listing queries:
+        # WHERE NOT is_deleted [AND category = ?] ORDER BY created_at DESC, id DESC
+        # id is last so keyset seeks on (created_at, id) are plain range scans
+        Index(
+            "ix_products_alive_created",
+            "created_at",
+            "id",
+            postgresql_where=_ALIVE,
+            sqlite_where=_ALIVE
+        ),
+        Index(
+            "ix_products_alive_category_created",
+            "category",
+            "created_at",
+            "id",
+            postgresql_where=_ALIVE,
+            sqlite_where=_ALIVE
+        ),
+    )
     
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
@@ -25,10 +50,30 @@ class Product(BaseModel):
     def __repr__(self):
         return f"<Product {self.name}>"
     
+    @classmethod
+    def search_vector(cls):
+        """PostgreSQL tsvector over name, description and SKU"""
+        empty = text("''")
+        space = text("' '")
+        return func.to_tsvector(
+            SEARCH_CONFIG,
+            func.coalesce(cls.name, empty) + space
+            + func.coalesce(cls.description, empty) + space
+            + func.coalesce(cls.sku, empty)
+        )
+    
     @property
     def price_float(self) -> float:
         return float(self.price)
     
     @property
     def is_in_stock(self) -> bool:
-        return self.stock > 0
\ No newline at end of file
+        return self.stock > 0
+
+
+# GIN index behind full-text product search (PostgreSQL only)
+Index(
+    "ix_products_search",
+    Product.search_vector(),
+    postgresql_using="gin"
+).ddl_if(dialect="postgresql")
@@ -2,7 +2,7 @@
 Pydantic Schemas
 Data validation and serialization schemas for API requests/responses
 """
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, validator
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -13,12 +13,11 @@ from decimal import Decimal
 
 class BaseResponseSchema(BaseModel):
     """Base schema for responses with common fields"""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: UUID
     created_at: datetime
     updated_at: datetime
-    
-    class Config:
-        from_attributes = True
 
 
 # ==================== User Schemas ====================
@@ -57,6 +56,12 @@ class UserResponse(BaseResponseSchema):
     username: str
     role: str
     is_active: bool
+    
+    @field_validator('role', mode='before')
+    @classmethod
+    def role_value(cls, v):
+        # ORM objects carry the UserRole enum, responses expose its value
+        return getattr(v, 'value', v)
 
 
 class UserInDB(UserResponse):
@@ -126,9 +131,6 @@ class ProductResponse(BaseResponseSchema):
     stock: int
     category: Optional[str]
     sku: str
-    
-    class Config:
-        from_attributes = True
 
 
 # ==================== Pagination Schemas ====================
@@ -151,6 +153,7 @@ class PaginatedResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
     
     class Config:
         arbitrary_types_allowed = True
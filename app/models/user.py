@@ -20,7 +20,7 @@ class User(BaseModel):
     Attributes:
         email: Unique user email
         username: Unique username
-        hashed_password: Bcrypt hashed password
+        hashed_password: Argon2id hashed password
         role: User role (admin/user)
         is_active: Account active status
     """
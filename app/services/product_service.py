@@ -3,19 +3,173 @@ Product Service
 Business logic for product CRUD operations with caching
 """
 from typing import Optional, List, Dict, Any, Tuple
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import select, update, func, or_, and_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from decimal import Decimal
+import base64
+import binascii
 import math
+from operator import itemgetter
+from datetime import datetime
 from uuid import UUID
 
-from ..models.product import Product
+from ..models.product import Product, SEARCH_CONFIG
 from ..models.schemas import (
-    ProductCreate, ProductUpdate, ProductFilter, ProductSort,
-    PaginationParams, PaginatedResponse
+    ProductCreate, ProductUpdate, ProductResponse, ProductFilter, ProductSort,
+    PaginationParams
 )
 from ..cache import product_cache
+from ..core.config import get_settings
+
+# Columns selected for list/search pages (plain rows, no ORM instances)
+_LIST_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.stock,
+    Product.category,
+    Product.sku,
+    Product.created_at,
+    Product.updated_at,
+)
+
+
+def encode_cursor(created_at: datetime, product_id: UUID) -> str:
+    """
+    Encode keyset cursor for the row a page ends on
+    
+    Args:
+        created_at: Creation time of the last row
+        product_id: ID of the last row
+    
+    Returns:
+        Opaque URL-safe cursor
+    """
+    raw = f"{created_at.isoformat()}|{product_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, UUID]]:
+    """
+    Decode keyset cursor
+    
+    Args:
+        cursor: Cursor from a previous page
+    
+    Returns:
+        Tuple of created_at and product ID, or None if malformed
+    """
+    try:
+        created_at, product_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        created_at, product_id = datetime.fromisoformat(created_at), UUID(product_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    
+    # created_at is stored naive; an aware value cannot be compared with it
+    if created_at.tzinfo is not None:
+        return None
+    return created_at, product_id
+
+
+def _filter_key(filters: Optional[ProductFilter]) -> Tuple:
+    """Cache key part for list filters"""
+    if not filters:
+        return ()
+    return (
+        filters.name,
+        filters.category,
+        filters.min_price,
+        filters.max_price,
+        filters.in_stock_only,
+    )
+
+
+def _sort_key(sort: Optional[ProductSort]) -> Tuple:
+    """Cache key part for list sort order"""
+    if not sort:
+        return ()
+    return (sort.sort_by, sort.sort_order)
+
+
+# Pulls the _LIST_COLUMNS values out of a row in one C-level call
+_LIST_VALUES = itemgetter(*range(len(_LIST_COLUMNS)))
+
+
+def _list_item(row) -> Dict[str, Any]:
+    """Build a cacheable list item from a product row"""
+    id_, name, description, price, stock, category, sku, created_at, updated_at = _LIST_VALUES(row)
+    return {
+        "id": str(id_),
+        "name": name,
+        "description": description,
+        "price": float(price),
+        "stock": stock,
+        "category": category,
+        "sku": sku,
+        "created_at": created_at.isoformat(),
+        "updated_at": updated_at.isoformat(),
+    }
+
+
+def _use_full_text(db: AsyncSession) -> bool:
+    """Check whether search can use the PostgreSQL full-text index"""
+    return (
+        get_settings().SEARCH_FULL_TEXT
+        and db.get_bind().dialect.name == "postgresql"
+    )
+
+
+async def _fetch_page(
+    db: AsyncSession,
+    query,
+    conditions: List[Any],
+    skip: int,
+    page_size: int,
+    total: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], int, Optional[Any]]:
+    """
+    Fetch a page of product items together with the total match count
+    
+    Unless the total is already known, it rides along on each row as
+    count(*) OVER (), so rows and count come back in one round-trip.
+    Rows are streamed and turned into items one at a time.
+    
+    Args:
+        db: Database session
+        query: Paginated column select
+        conditions: WHERE conditions of the query
+        skip: Offset of the page
+        page_size: Rows per page (fetch batch size)
+        total: Known total, skips counting
+    
+    Returns:
+        Tuple of items, total and the last row (None if empty)
+    """
+    counted = total is None
+    if counted:
+        query = query.add_columns(func.count().over().label("total"))
+    
+    items = []
+    last_row = None
+    result = await db.stream(query.execution_options(yield_per=page_size))
+    async for row in result:
+        items.append(_list_item(row))
+        last_row = row
+    
+    if counted:
+        if last_row is not None:
+            total = last_row.total
+        elif skip == 0:
+            total = 0
+        else:
+            # Past the last page there are no rows to carry the count
+            total_result = await db.execute(
+                select(func.count(Product.id)).where(*conditions)
+            )
+            total = total_result.scalar()
+    
+    return items, total, last_row
 
 
 class ProductService:
@@ -56,9 +210,12 @@ class ProductService:
         db: AsyncSession, 
         product_id: UUID,
         use_cache: bool = True
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[bytes]:
         """
-        Get product by ID with optional caching
+        Get serialized product by ID with optional caching
+        
+        The cached value is the finished ProductResponse JSON, so a cache
+        hit needs no model construction or encoding.
         
         Args:
             db: Database session
@@ -66,7 +223,7 @@ class ProductService:
             use_cache: Whether to use cache
         
         Returns:
-            Product dictionary or None
+            Product JSON body or None
         """
         # Try cache first
         if use_cache:
@@ -77,7 +234,7 @@ class ProductService:
         # Query database
         result = await db.execute(
             select(Product).where(
-                Product.id == str(product_id),
+                Product.id == product_id,
                 Product.is_deleted == False
             )
         )
@@ -86,24 +243,13 @@ class ProductService:
         if not product:
             return None
         
-        # Convert to dict
-        product_dict = {
-            "id": str(product.id),
-            "name": product.name,
-            "description": product.description,
-            "price": float(product.price),
-            "stock": product.stock,
-            "category": product.category,
-            "sku": product.sku,
-            "created_at": product.created_at.isoformat(),
-            "updated_at": product.updated_at.isoformat(),
-        }
+        body = ProductResponse.model_validate(product).model_dump_json().encode()
         
         # Cache result
         if use_cache:
-            await product_cache.set_product_detail(str(product_id), product_dict)
+            await product_cache.set_product_detail(str(product_id), body)
         
-        return product_dict
+        return body
     
     @staticmethod
     async def get_products(
@@ -111,25 +257,30 @@ class ProductService:
         pagination: PaginationParams,
         filters: Optional[ProductFilter] = None,
         sort: Optional[ProductSort] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
         use_cache: bool = True
-    ) -> PaginatedResponse:
+    ) -> Dict[str, Any]:
         """
         Get paginated products with filtering and sorting
         
+        With the default newest-first sort, pages can also be fetched by
+        keyset: pass the decoded next_cursor of the previous page as
+        `after` to seek past it instead of using an OFFSET.
+        
         Args:
             db: Database session
             pagination: Pagination parameters
             filters: Filter parameters
             sort: Sort parameters
+            after: Decoded cursor (created_at, id) to continue after
             use_cache: Whether to use cache
         
         Returns:
-            Paginated response with products
+            Paginated response data (PaginatedResponse shape)
         """
-        # Build filter dict for cache key
-        filter_dict = filters.model_dump() if filters else {}
-        sort_dict = sort.model_dump() if sort else {}
-        cache_key_data = {**filter_dict, **sort_dict}
+        # Build cache keys from plain field tuples
+        filter_key = _filter_key(filters)
+        cache_key_data = filter_key + _sort_key(sort) + (after or ())
         
         # Try cache first
         if use_cache:
@@ -139,80 +290,81 @@ class ProductService:
                 cache_key_data
             )
             if cached:
-                return PaginatedResponse(**cached)
+                return cached
         
-        # Build query
-        query = select(Product).where(Product.is_deleted == False)
-        count_query = select(func.count(Product.id)).where(Product.is_deleted == False)
+        # Build filter conditions
+        conditions = [Product.is_deleted == False]
         
         # Apply filters
         if filters:
             if filters.name:
-                query = query.where(Product.name.ilike(f"%{filters.name}%"))
-                count_query = count_query.where(Product.name.ilike(f"%{filters.name}%"))
+                conditions.append(Product.name.ilike(f"%{filters.name}%"))
             
             if filters.category:
-                query = query.where(Product.category == filters.category)
-                count_query = count_query.where(Product.category == filters.category)
+                conditions.append(Product.category == filters.category)
             
             if filters.min_price is not None:
-                query = query.where(Product.price >= filters.min_price)
-                count_query = count_query.where(Product.price >= filters.min_price)
+                conditions.append(Product.price >= filters.min_price)
             
             if filters.max_price is not None:
-                query = query.where(Product.price <= filters.max_price)
-                count_query = count_query.where(Product.price <= filters.max_price)
+                conditions.append(Product.price <= filters.max_price)
             
             if filters.in_stock_only:
-                query = query.where(Product.stock > 0)
-                count_query = count_query.where(Product.stock > 0)
+                conditions.append(Product.stock > 0)
         
-        # Get total count
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        query = select(*_LIST_COLUMNS).where(*conditions)
+        
+        # Total is shared by every page and sort order of these filters
+        total = None
+        if use_cache:
+            total = await product_cache.get_product_count(filter_key)
+        cached_total = total is not None
         
-        # Apply sorting
-        if sort:
+        # Apply sorting (id breaks created_at ties so keyset pages are stable)
+        keyset = sort is None or (sort.sort_by == "created_at" and sort.sort_order == "desc")
+        if keyset:
+            query = query.order_by(Product.created_at.desc(), Product.id.desc())
+        else:
             sort_column = getattr(Product, sort.sort_by, Product.created_at)
             if sort.sort_order == "asc":
                 query = query.order_by(sort_column.asc())
             else:
                 query = query.order_by(sort_column.desc())
-        else:
-            query = query.order_by(Product.created_at.desc())
         
         # Apply pagination
-        query = query.offset(pagination.skip).limit(pagination.page_size)
+        skip = pagination.skip
+        if after and keyset:
+            query = query.where(tuple_(Product.created_at, Product.id) < after)
+            skip = 0
+            # The window would only count rows past the cursor
+            if total is None:
+                total_result = await db.execute(
+                    select(func.count(Product.id)).where(*conditions)
+                )
+                total = total_result.scalar()
+        query = query.offset(skip).limit(pagination.page_size)
         
         # Execute query
-        result = await db.execute(query)
-        products = result.scalars().all()
+        items, total, last_row = await _fetch_page(
+            db, query, conditions, skip, pagination.page_size, total
+        )
+        if use_cache and not cached_total:
+            await product_cache.set_product_count(total, filter_key)
         
         # Calculate total pages
         total_pages = math.ceil(total / pagination.page_size) if total > 0 else 1
         
         # Build response
-        items = [
-            {
-                "id": str(p.id),
-                "name": p.name,
-                "description": p.description,
-                "price": float(p.price),
-                "stock": p.stock,
-                "category": p.category,
-                "sku": p.sku,
-                "created_at": p.created_at.isoformat(),
-                "updated_at": p.updated_at.isoformat(),
-            }
-            for p in products
-        ]
-        
         response_data = {
             "items": items,
             "total": total,
             "page": pagination.page,
             "page_size": pagination.page_size,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "next_cursor": (
+                encode_cursor(last_row.created_at, last_row.id)
+                if keyset and len(items) == pagination.page_size else None
+            )
         }
         
         # Cache result
@@ -224,7 +376,7 @@ class ProductService:
                 cache_key_data
             )
         
-        return PaginatedResponse(**response_data)
+        return response_data
     
     @staticmethod
     async def update_product(
@@ -243,25 +395,27 @@ class ProductService:
         Returns:
             Updated product instance or None
         """
+        update_dict = update_data.model_dump(exclude_unset=True)
+        
+        # Expire any copy already in the session so the RETURNING row
+        # repopulates it; populate_existing alone does not before 2.0.36
+        held = db.identity_map.get(db.identity_key(Product, product_id))
+        if held is not None:
+            db.expire(held)
+        
+        # Single UPDATE ... RETURNING instead of SELECT, then flush
         result = await db.execute(
-            select(Product).where(
-                Product.id == str(product_id),
-                Product.is_deleted == False
-            )
+            update(Product)
+            .where(Product.id == product_id, Product.is_deleted == False)
+            .values(**update_dict)
+            .returning(Product)
+            .execution_options(synchronize_session=False, populate_existing=True)
         )
         product = result.scalar_one_or_none()
         
         if not product:
             return None
         
-        update_dict = update_data.model_dump(exclude_unset=True)
-        
-        for field, value in update_dict.items():
-            setattr(product, field, value)
-        
-        await db.flush()
-        await db.refresh(product)
-        
         # Invalidate cache
         await product_cache.invalidate_product(str(product_id))
         
@@ -279,20 +433,18 @@ class ProductService:
         Returns:
             Success status
         """
+        # Single-statement soft delete; RETURNING tells us if a row matched
         result = await db.execute(
-            select(Product).where(
-                Product.id == str(product_id),
-                Product.is_deleted == False
-            )
+            update(Product)
+            .where(Product.id == product_id, Product.is_deleted == False)
+            .values(is_deleted=True)
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
         )
-        product = result.scalar_one_or_none()
         
-        if not product:
+        if result.scalar_one_or_none() is None:
             return False
         
-        product.soft_delete()
-        await db.flush()
-        
         # Invalidate cache
         await product_cache.invalidate_product(str(product_id))
         
@@ -304,10 +456,14 @@ class ProductService:
         query: str,
         pagination: PaginationParams,
         use_cache: bool = True
-    ) -> PaginatedResponse:
+    ) -> Dict[str, Any]:
         """
         Search products by name, description, or SKU
         
+        On PostgreSQL this is a full-text word match on the GIN-indexed
+        search vector; elsewhere (or with SEARCH_FULL_TEXT off) it falls
+        back to substring ILIKE.
+        
         Args:
             db: Database session
             query: Search query
@@ -315,7 +471,7 @@ class ProductService:
             use_cache: Whether to use cache
         
         Returns:
-            Paginated response with matching products
+            Paginated response data with matching products
         """
         # Try cache first
         if use_cache:
@@ -325,60 +481,36 @@ class ProductService:
                 pagination.page_size
             )
             if cached:
-                return PaginatedResponse(**cached)
+                return cached
         
         # Build search query
-        search_term = f"%{query}%"
-        base_query = select(Product).where(
-            Product.is_deleted == False,
-            or_(
-                Product.name.ilike(search_term),
-                Product.description.ilike(search_term),
-                Product.sku.ilike(search_term)
+        if _use_full_text(db):
+            # Word match served by the ix_products_search GIN index
+            match = Product.search_vector().op("@@")(
+                func.plainto_tsquery(SEARCH_CONFIG, query)
             )
-        )
-        
-        # Count query
-        count_query = select(func.count(Product.id)).where(
-            Product.is_deleted == False,
-            or_(
+        else:
+            search_term = f"%{query}%"
+            match = or_(
                 Product.name.ilike(search_term),
                 Product.description.ilike(search_term),
                 Product.sku.ilike(search_term)
             )
-        )
-        
-        # Get total count
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        conditions = [Product.is_deleted == False, match]
         
         # Get paginated results
-        paginated_query = base_query.order_by(Product.created_at.desc()).offset(
-            pagination.skip
-        ).limit(pagination.page_size)
+        paginated_query = select(*_LIST_COLUMNS).where(*conditions).order_by(
+            Product.created_at.desc()
+        ).offset(pagination.skip).limit(pagination.page_size)
         
-        result = await db.execute(paginated_query)
-        products = result.scalars().all()
+        items, total, _ = await _fetch_page(
+            db, paginated_query, conditions, pagination.skip, pagination.page_size
+        )
         
         # Calculate total pages
         total_pages = math.ceil(total / pagination.page_size) if total > 0 else 1
         
         # Build response
-        items = [
-            {
-                "id": str(p.id),
-                "name": p.name,
-                "description": p.description,
-                "price": float(p.price),
-                "stock": p.stock,
-                "category": p.category,
-                "sku": p.sku,
-                "created_at": p.created_at.isoformat(),
-                "updated_at": p.updated_at.isoformat(),
-            }
-            for p in products
-        ]
-        
         response_data = {
             "items": items,
             "total": total,
@@ -396,4 +528,4 @@ class ProductService:
                 response_data
             )
         
-        return PaginatedResponse(**response_data)
+        return response_data
@@ -2,12 +2,44 @@
 User Service
 Business logic for user management and authentication
 """
-from typing import Optional
-from sqlalchemy import select
+import asyncio
+import math
+from functools import cache
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select, insert, update, func, or_, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..models.user import User, UserRole
-from ..models.schemas import UserCreate, UserUpdate
-from ..core.security import get_password_hash, verify_password
+from ..models.schemas import (
+    UserCreate, UserUpdate, UserResponse, PaginationParams, PaginatedResponse
+)
+from ..core.security import get_password_hash, verify_password, password_needs_rehash
+from ..cache import user_cache
+
+# Lookup statements built once; only the bound values change per call
+_GET_BY_EMAIL = select(User).where(
+    User.email == bindparam("email"),
+    User.is_deleted == False
+)
+_GET_BY_USERNAME = select(User).where(
+    User.username == bindparam("username"),
+    User.is_deleted == False
+)
+_GET_BY_EMAIL_OR_USERNAME = select(User).where(
+    or_(User.email == bindparam("email"), User.username == bindparam("username")),
+    User.is_deleted == False
+)
+
+
+@cache
+def _dummy_password_hash() -> str:
+    """Hash checked for unknown users so login timing does not reveal them"""
+    return get_password_hash("dummy-password-for-timing")
+
+
+def _verify_login_password(password: str, hashed_password: Optional[str]) -> bool:
+    """Verify password, against the dummy hash when the user is unknown"""
+    return verify_password(password, hashed_password or _dummy_password_hash())
 
 
 class UserService:
@@ -25,24 +57,24 @@ class UserService:
         Returns:
             Created user instance
         """
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
         
-        user = User(
-            email=user_data.email,
-            username=user_data.username,
-            hashed_password=hashed_password,
-            role=UserRole.USER,
-            is_active=True
+        # Single INSERT ... RETURNING instead of flush, then refresh
+        result = await db.execute(
+            insert(User)
+            .values(
+                email=user_data.email,
+                username=user_data.username,
+                hashed_password=hashed_password,
+                role=UserRole.USER,
+                is_active=True
+            )
+            .returning(User)
         )
-        
-        db.add(user)
-        await db.flush()
-        await db.refresh(user)
-        
-        return user
+        return result.scalar_one()
     
     @staticmethod
-    async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
         """
         Get user by ID
         
@@ -53,13 +85,54 @@ class UserService:
         Returns:
             User instance or None
         """
-        result = await db.execute(
-            select(User).where(
-                User.id == user_id,
-                User.is_deleted == False
-            )
+        # Served from the session identity map without SQL when already loaded
+        user = await db.get(User, user_id)
+        if user is None or user.is_deleted:
+            return None
+        return user
+    
+    @staticmethod
+    async def get_users(db: AsyncSession, pagination: PaginationParams) -> PaginatedResponse:
+        """
+        Get paginated users
+        
+        Rows are streamed from the database so only one page of users
+        is held in memory at a time.
+        
+        Args:
+            db: Database session
+            pagination: Pagination parameters
+        
+        Returns:
+            Paginated response with users
+        """
+        count_query = select(func.count(User.id)).where(User.is_deleted == False)
+        total_result = await db.execute(count_query)
+        total = total_result.scalar()
+        
+        query = (
+            select(User)
+            .where(User.is_deleted == False)
+            .order_by(User.created_at.desc(), User.id.desc())
+            .offset(pagination.skip)
+            .limit(pagination.page_size)
+            .execution_options(yield_per=200)
+        )
+        
+        items = [
+            UserResponse.model_validate(user)
+            async for user in await db.stream_scalars(query)
+        ]
+        
+        total_pages = math.ceil(total / pagination.page_size) if total > 0 else 1
+        
+        return PaginatedResponse(
+            items=items,
+            total=total,
+            page=pagination.page,
+            page_size=pagination.page_size,
+            total_pages=total_pages
         )
-        return result.scalar_one_or_none()
     
     @staticmethod
     async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
@@ -73,12 +146,7 @@ class UserService:
         Returns:
             User instance or None
         """
-        result = await db.execute(
-            select(User).where(
-                User.email == email,
-                User.is_deleted == False
-            )
-        )
+        result = await db.execute(_GET_BY_EMAIL, {"email": email})
         return result.scalar_one_or_none()
     
     @staticmethod
@@ -93,13 +161,33 @@ class UserService:
         Returns:
             User instance or None
         """
+        result = await db.execute(_GET_BY_USERNAME, {"username": username})
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_user_by_email_or_username(
+        db: AsyncSession,
+        email: str,
+        username: str
+    ) -> List[User]:
+        """
+        Get users matching either email or username in one query
+        
+        Both columns are unique, so at most two users are returned: one
+        holding the email and one holding the username.
+        
+        Args:
+            db: Database session
+            email: User email
+            username: Username
+        
+        Returns:
+            Conflicting user instances
+        """
         result = await db.execute(
-            select(User).where(
-                User.username == username,
-                User.is_deleted == False
-            )
+            _GET_BY_EMAIL_OR_USERNAME, {"email": email, "username": username}
         )
-        return result.scalar_one_or_none()
+        return list(result.scalars())
     
     @staticmethod
     async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
@@ -116,17 +204,59 @@ class UserService:
         """
         user = await UserService.get_user_by_username(db, username)
         
+        # Always run one verify so unknown users take as long as known ones.
+        # Hashing is CPU-bound, so it runs off the event loop, as does the
+        # one-off dummy hash built by the first unknown-user login.
+        password_ok = await asyncio.to_thread(
+            _verify_login_password, password, user.hashed_password if user else None
+        )
+        
         if not user:
             return None
         
         if not user.is_active:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        if not password_ok:
             return None
         
+        # Upgrade legacy bcrypt or outdated Argon2 hashes while the
+        # plain password is at hand
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = await asyncio.to_thread(get_password_hash, password)
+            await db.flush()
+        
         return user
     
+    @staticmethod
+    async def _update_returning(db: AsyncSession, user: User, **values) -> User:
+        """
+        Apply column values with a single UPDATE ... RETURNING
+        
+        The instance is expired first so the RETURNING row repopulates it
+        on every SQLAlchemy 2.0 release, without a follow-up SELECT.
+        
+        Args:
+            db: Database session
+            user: User instance
+            **values: Column values to set
+        
+        Returns:
+            Updated user instance
+        """
+        user_id = user.id
+        if user in db:
+            db.expire(user)
+        
+        result = await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return result.scalar_one()
+    
     @staticmethod
     async def update_user(db: AsyncSession, user: User, update_data: UserUpdate) -> User:
         """
@@ -140,16 +270,19 @@ class UserService:
         Returns:
             Updated user instance
         """
-        update_dict = update_data.model_dump(exclude_unset=True)
+        # Only the explicitly set fields, without a full model_dump
+        values = {}
+        for field in update_data.model_fields_set:
+            value = getattr(update_data, field)
+            if field == "password":
+                values["hashed_password"] = await asyncio.to_thread(get_password_hash, value)
+            else:
+                values[field] = value
         
-        if "password" in update_dict:
-            update_dict["hashed_password"] = get_password_hash(update_dict.pop("password"))
+        user = await UserService._update_returning(db, user, **values)
         
-        for field, value in update_dict.items():
-            setattr(user, field, value)
-        
-        await db.flush()
-        await db.refresh(user)
+        # Invalidate cache
+        await user_cache.invalidate_user(user.id)
         
         return user
     
@@ -164,6 +297,9 @@ class UserService:
         """
         user.soft_delete()
         await db.flush()
+        
+        # Invalidate cache
+        await user_cache.invalidate_user(user.id)
     
     @staticmethod
     async def update_role(db: AsyncSession, user: User, role: UserRole) -> User:
@@ -178,8 +314,9 @@ class UserService:
         Returns:
             Updated user instance
         """
-        user.role = role
-        await db.flush()
-        await db.refresh(user)
+        user = await UserService._update_returning(db, user, role=role)
+        
+        # Invalidate cache
+        await user_cache.invalidate_user(user.id)
         
         return user
@@ -4,16 +4,22 @@ Utility functions and dependencies
 """
 from .auth import (
     oauth2_scheme,
+    cached_decode_token,
+    load_user_once,
     get_current_user,
     get_current_active_user,
     get_current_admin_user,
     require_role
 )
+from .middleware import JWTMiddleware
 
 __all__ = [
     "oauth2_scheme",
+    "cached_decode_token",
+    "load_user_once",
     "get_current_user",
     "get_current_active_user",
     "get_current_admin_user",
     "require_role",
+    "JWTMiddleware",
 ]
@@ -2,34 +2,148 @@
 Authentication Dependencies
 FastAPI dependencies for authentication and authorization
 """
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+import asyncio
+import hashlib
+import time
+from typing import Optional, Dict, Any
+from uuid import UUID
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.database import get_db
-from ..models.user import User, UserRole
+from ..models.user import UserRole
 from ..models.schemas import TokenPayload
-from ..core.security import decode_token, verify_token_type
+from ..core.security import decode_token, verify_token_type, get_token_subject
 from ..services.user_service import UserService
+from ..cache.memory_cache import TTLCache
+from ..cache.user_cache import user_cache, UserSnapshot
+
+
+# Decoded JWT payloads keyed by token digest, never outliving the token itself
+_JWT_CACHE = TTLCache(maxsize=4096, ttl=300)
+
+# User lookups currently running, keyed by user id
+_INFLIGHT_USERS: Dict[UUID, "asyncio.Future[Optional[UserSnapshot]]"] = {}
+
+
+def cached_decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode JWT token, reusing the payload of recently verified tokens
+    
+    Args:
+        token: JWT token string
+    
+    Returns:
+        Decoded payload or None if invalid (invalid tokens are never cached)
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _JWT_CACHE.get(key)
+    if payload is not None:
+        return payload
+    
+    payload = decode_token(token)
+    if payload is None:
+        return None
+    
+    exp = payload.get("exp")
+    if exp is not None:
+        _JWT_CACHE.set(key, payload, ttl=exp - time.time())
+    
+    return payload
+
+
+# Request state key holding the payload decoded by JWTMiddleware
+JWT_STATE_KEY = "jwt_payload"
+
+
+class OAuth2PayloadBearer(OAuth2PasswordBearer):
+    """
+    OAuth2 password bearer scheme that yields the decoded token payload
+    
+    Reuses the payload JWTMiddleware stored for the request, and only
+    parses the Authorization header itself when the middleware did not.
+    """
+    
+    async def __call__(self, request: Request) -> Optional[Dict[str, Any]]:
+        state = request.scope.get("state")
+        if state is not None and JWT_STATE_KEY in state:
+            return state[JWT_STATE_KEY]
+        
+        token = await super().__call__(request)
+        return cached_decode_token(token) if token else None
+
 
 # OAuth2 scheme for token authentication
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+oauth2_scheme = OAuth2PayloadBearer(
+    tokenUrl="/api/v1/auth/login",
+    scheme_name="OAuth2PasswordBearer"
+)
+
+
+async def load_user_once(db: AsyncSession, user_id: UUID) -> Optional[UserSnapshot]:
+    """
+    Load and cache a user, sharing one query between concurrent callers
+    
+    Requests that miss the cache for the same user while a lookup is in
+    flight wait for its result instead of issuing their own SELECT. If the
+    request running the lookup is cancelled, its waiters retry on their own.
+    
+    Args:
+        db: Database session
+        user_id: User UUID
+    
+    Returns:
+        Snapshot of the user or None if not found
+    """
+    while True:
+        pending = _INFLIGHT_USERS.get(user_id)
+        if pending is None:
+            break
+        try:
+            # Shielded so a cancelled waiter does not cancel the shared lookup
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Only the leader was cancelled: look the user up again
+            if not pending.cancelled() or asyncio.current_task().cancelling():
+                raise
+    
+    future = asyncio.get_running_loop().create_future()
+    _INFLIGHT_USERS[user_id] = future
+    try:
+        db_user = await UserService.get_user_by_id(db, user_id)
+        user = await user_cache.set_user(db_user) if db_user is not None else None
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Mark retrieved, since there may be no waiters to re-raise it
+        future.exception()
+        raise
+    else:
+        future.set_result(user)
+        return user
+    finally:
+        del _INFLIGHT_USERS[user_id]
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
+    payload: Optional[Dict[str, Any]] = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> UserSnapshot:
     """
     Dependency to get current authenticated user
     
+    Users are served from a short-lived per-worker cache backed by Redis,
+    so repeat clients skip the user SELECT entirely.
+    
     Args:
-        token: JWT access token
+        payload: Decoded JWT access token payload
         db: Database session
     
     Returns:
-        Current user instance
+        Snapshot of the current user
     
     Raises:
         HTTPException: If authentication fails
@@ -40,8 +154,6 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_token(token)
-    
     if payload is None:
         raise credentials_exception
     
@@ -52,15 +164,18 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id: str = payload.get("sub")
+    user_id = get_token_subject(payload)
     
     if user_id is None:
         raise credentials_exception
     
-    user = await UserService.get_user_by_id(db, user_id)
+    user = await user_cache.get_user(user_id)
     
     if user is None:
-        raise credentials_exception
+        user = await load_user_once(db, user_id)
+        
+        if user is None:
+            raise credentials_exception
     
     if not user.is_active:
         raise HTTPException(
@@ -72,8 +187,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_user, use_cache=True)
+) -> UserSnapshot:
     """
     Dependency to verify user is active
     
@@ -95,11 +210,14 @@ async def get_current_active_user(
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserSnapshot = Depends(get_current_user, use_cache=True)
+) -> UserSnapshot:
     """
     Dependency to verify user has admin role
     
+    Shares the per-request cached get_current_user result, so the role
+    check is an attribute compare with no extra user lookup.
+    
     Args:
         current_user: Current authenticated user
     
@@ -128,8 +246,8 @@ def require_role(required_role: UserRole):
         Dependency function
     """
     async def role_checker(
-        current_user: User = Depends(get_current_user)
-    ) -> User:
+        current_user: UserSnapshot = Depends(get_current_user, use_cache=True)
+    ) -> UserSnapshot:
         if current_user.role != required_role and current_user.role != UserRole.ADMIN:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
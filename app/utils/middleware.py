@@ -0,0 +1,31 @@
+"""
+Authentication Middleware
+Decodes bearer tokens once per request for the auth dependencies
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .auth import JWT_STATE_KEY, cached_decode_token
+
+
+class JWTMiddleware:
+    """
+    Bearer token decoding middleware
+    
+    Parses the Authorization header once and stores the decoded payload
+    (None when invalid) in the request state, where the OAuth2 scheme
+    dependency picks it up. Requests without a bearer token are left alone.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.partition(b" ")
+                    if scheme.lower() == b"bearer" and token:
+                        state = scope.setdefault("state", {})
+                        state[JWT_STATE_KEY] = cached_decode_token(token.decode("latin-1"))
+                    break
+        
+        await self.app(scope, receive, send)
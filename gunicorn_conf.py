@@ -0,0 +1,51 @@
+"""
+Gunicorn Configuration
+Production process manager settings for Uvicorn workers
+"""
+import math
+import os
+
+# Server socket
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Cap for the derived worker count; each worker has its own DB pool and Redis client
+MAX_DEFAULT_WORKERS = 4
+
+
+def available_cpus() -> int:
+    """
+    Count the CPUs this process may actually use
+    
+    Honours a cgroup v2 CPU quota (docker `cpus:` limits) and the CPU
+    affinity mask, rather than the host's core count.
+    
+    Returns:
+        Number of usable CPUs, at least 1
+    """
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+# Worker processes - one event loop per worker, fanned out across usable cores
+workers = int(os.getenv(
+    "WEB_CONCURRENCY",
+    min(available_cpus() * 2 + 1, MAX_DEFAULT_WORKERS)
+))
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 5
+
+# Import the app once in the master so workers share its pages copy-on-write.
+# Redis and database connections are opened per worker in the app lifespan.
+preload_app = True
+
+# Logging - requests are already logged by LoggingMiddleware
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
@@ -1,38 +1,146 @@
 """
 Pytest Configuration
-Test fixtures for async testing with database and Redis mocking
+Test fixtures for async testing with database and an in-memory Redis
 """
-import asyncio
+import os
+
+# Minimal Argon2id cost for tests; must be set before settings are loaded
+os.environ.setdefault("PASSWORD_HASH_TIME_COST", "1")
+os.environ.setdefault("PASSWORD_HASH_MEMORY_KIB", "8")
+os.environ.setdefault("PASSWORD_HASH_PARALLELISM", "1")
+
 import pytest
 import pytest_asyncio
-from typing import AsyncGenerator
+from fnmatch import fnmatch
+from typing import (
+    Any, AsyncGenerator, Awaitable, Callable, Dict, Generator, Iterable, List, Optional, Tuple
+)
+from uuid import uuid4
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import patch
 
 from app.main import app
 from app.db.database import Base, get_db
 from app.models.user import User, UserRole
 from app.core.security import get_password_hash, create_access_token
 from app.cache.redis_client import redis_client
+from app.cache import product_cache
+from app.cache.user_cache import user_cache
+from app.utils.auth import _JWT_CACHE, _INFLIGHT_USERS
 
 
 # Test database URL (in-memory SQLite)
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+_TEST_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA locking_mode=EXCLUSIVE",
+)
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create event loop for async tests"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Password hashes computed once, since hashing is deliberately slow
+USER_PASSWORD_HASH = get_password_hash("TestPass123")
+ADMIN_PASSWORD_HASH = get_password_hash("AdminPass123")
 
 
-@pytest_asyncio.fixture(scope="function")
+class FakeRedis:
+    """
+    In-memory stand-in for the redis.asyncio client
+    
+    Covers the commands RedisClient issues, so the real client code runs
+    against it. Expiry times are ignored.
+    """
+    
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+    
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+    
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self.data[key] = self._encode(value)
+        return True
+    
+    async def delete(self, *keys: str) -> int:
+        return sum(self.data.pop(key, None) is not None for key in keys)
+    
+    async def unlink(self, *keys: str) -> int:
+        return await self.delete(*keys)
+    
+    async def exists(self, key: str) -> int:
+        return int(key in self.data)
+    
+    async def incr(self, key: str) -> int:
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = self._encode(value)
+        return value
+    
+    async def expire(self, key: str, seconds: int) -> bool:
+        return key in self.data
+    
+    async def scan_iter(self, match: str = "*", count: Optional[int] = None):
+        for key in [key for key in self.data if fnmatch(key, match)]:
+            yield key
+    
+    async def flushdb(self) -> bool:
+        self.data.clear()
+        return True
+    
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues FakeRedis commands until execute()"""
+    
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands: List[Tuple[str, tuple]] = []
+    
+    def __getattr__(self, name: str):
+        def queue(*args):
+            self._commands.append((name, args))
+            return self
+        return queue
+    
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._redis, name)(*args) for name, args in commands]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_redis() -> Generator[FakeRedis, None, None]:
+    """Back the global Redis client with an in-memory fake for the session"""
+    fake = FakeRedis()
+    with patch.object(redis_client, "_client", fake), \
+         patch.object(redis_client, "_connected", True):
+        yield fake
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(fake_redis: FakeRedis) -> None:
+    """Start every test with empty Redis and in-process caches"""
+    fake_redis.data.clear()
+    user_cache._users.clear()
+    user_cache._responses.clear()
+    product_cache._generations.clear()
+    _JWT_CACHE.clear()
+    _INFLIGHT_USERS.clear()
+
+
+@pytest_asyncio.fixture(scope="session")
 async def test_engine():
-    """Create test database engine"""
+    """Create test database engine and schema once per session"""
     engine = create_async_engine(
         TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},
@@ -40,110 +148,176 @@ async def test_engine():
         echo=False
     )
     
+    # pysqlite's implicit transactions break SAVEPOINT; let SQLAlchemy
+    # emit BEGIN itself instead. Durability is irrelevant for a throwaway
+    # database, so journaling and syncs are kept off the write path.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in _TEST_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+    
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
     yield engine
     
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    
     await engine.dispose()
 
 
 @pytest_asyncio.fixture(scope="function")
 async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
-    """Create test database session"""
-    async_session = async_sessionmaker(
-        test_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
+    """
+    Create test database session inside a rolled-back transaction
     
-    async with async_session() as session:
-        yield session
+    Commits only release a SAVEPOINT, so every test starts from the
+    empty schema without recreating it.
+    """
+    async with test_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        )
+        
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """Create one ASGI test client shared by the whole session"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
 
 
 @pytest_asyncio.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create test client with database dependency override"""
+async def client(
+    http_client: AsyncClient,
+    db_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Bind the shared test client to this test's database session"""
     
     async def override_get_db():
         yield db_session
     
     app.dependency_overrides[get_db] = override_get_db
     
-    # Mock Redis client
-    with patch.object(redis_client, 'get', new_callable=AsyncMock) as mock_get, \
-         patch.object(redis_client, 'set', new_callable=AsyncMock) as mock_set, \
-         patch.object(redis_client, 'delete', new_callable=AsyncMock) as mock_delete, \
-         patch.object(redis_client, 'delete_pattern', new_callable=AsyncMock) as mock_delete_pattern:
-        
-        mock_get.return_value = None
-        mock_set.return_value = True
-        mock_delete.return_value = True
-        mock_delete_pattern.return_value = 0
-        
-        transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as ac:
-            yield ac
+    yield http_client
     
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="session")
+def commit_rows(test_engine) -> Callable[[Iterable[Any]], Awaitable[None]]:
+    """
+    Get a helper that commits rows outside the per-test transactions
+    
+    Wider-scoped fixtures use it to seed data once; each test's rollback
+    then undoes its own changes and leaves the seeded rows in place.
+    """
+    async def commit(rows: Iterable[Any]) -> None:
+        async with AsyncSession(test_engine, expire_on_commit=False) as session:
+            session.add_all(rows)
+            await session.commit()
+    
+    return commit
+
+
+@pytest_asyncio.fixture(scope="session")
+async def seed_users(
+    commit_rows: Callable[[Iterable[Any]], Awaitable[None]]
+) -> AsyncGenerator[Dict[str, User], None]:
+    """
+    Create the test user and admin once per session
+    
+    Every test shares these two accounts, so they are never removed;
+    test_user and test_admin load them into each test's own session.
+    """
+    users = {
+        "user": User(
+            id=uuid4(),
+            email="test@example.com",
+            username="testuser",
+            hashed_password=USER_PASSWORD_HASH,
+            role=UserRole.USER,
+            is_active=True
+        ),
+        "admin": User(
+            id=uuid4(),
+            email="admin@example.com",
+            username="adminuser",
+            hashed_password=ADMIN_PASSWORD_HASH,
+            role=UserRole.ADMIN,
+            is_active=True
+        ),
+    }
+    
+    await commit_rows(users.values())
+    
+    yield users
+
+
+@pytest_asyncio.fixture
+async def test_user(db_session: AsyncSession, seed_users: Dict[str, User]) -> User:
+    """Get test user, attached to this test's session"""
+    return await db_session.get(User, seed_users["user"].id)
+
+
 @pytest_asyncio.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create test user"""
+async def test_admin(db_session: AsyncSession, seed_users: Dict[str, User]) -> User:
+    """Get test admin user, attached to this test's session"""
+    return await db_session.get(User, seed_users["admin"].id)
+
+
+@pytest_asyncio.fixture
+async def disposable_user(db_session: AsyncSession) -> User:
+    """Create a throwaway user for tests that delete or deactivate one"""
     user = User(
-        id=str(__import__('uuid').uuid4()),  # Convert to string
-        email="test@example.com",
-        username="testuser",
-        hashed_password=get_password_hash("TestPass123"),
+        id=uuid4(),
+        email="disposable@example.com",
+        username="disposableuser",
+        hashed_password=USER_PASSWORD_HASH,
         role=UserRole.USER,
         is_active=True
     )
     db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    await db_session.flush()
     return user
 
 
-@pytest_asyncio.fixture
-async def test_admin(db_session: AsyncSession) -> User:
-    """Create test admin user"""
-    admin = User(
-        id=str(__import__('uuid').uuid4()),  # Convert to string
-        email="admin@example.com",
-        username="adminuser",
-        hashed_password=get_password_hash("AdminPass123"),
-        role=UserRole.ADMIN,
-        is_active=True
-    )
-    db_session.add(admin)
-    await db_session.commit()
-    await db_session.refresh(admin)
-    return admin
-
-
-@pytest_asyncio.fixture
-def user_token(test_user: User) -> str:
+@pytest.fixture(scope="session")
+def user_token(seed_users: Dict[str, User]) -> str:
     """Create access token for test user"""
-    return create_access_token({"sub": str(test_user.id), "role": test_user.role.value})
+    user = seed_users["user"]
+    return create_access_token({"sub": str(user.id), "role": user.role.value})
 
 
-@pytest_asyncio.fixture
-def admin_token(test_admin: User) -> str:
+@pytest.fixture(scope="session")
+def admin_token(seed_users: Dict[str, User]) -> str:
     """Create access token for test admin"""
-    return create_access_token({"sub": str(test_admin.id), "role": test_admin.role.value})
+    admin = seed_users["admin"]
+    return create_access_token({"sub": str(admin.id), "role": admin.role.value})
 
 
-@pytest_asyncio.fixture
+@pytest.fixture(scope="session")
 def auth_headers(user_token: str) -> dict:
     """Create authorization headers for user"""
     return {"Authorization": f"Bearer {user_token}"}
 
 
-@pytest_asyncio.fixture
+@pytest.fixture(scope="session")
 def admin_auth_headers(admin_token: str) -> dict:
     """Create authorization headers for admin"""
-    return {"Authorization": f"Bearer {admin_token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {admin_token}"}
@@ -2,9 +2,27 @@
 Authentication Tests
 Tests for registration, login, token refresh, and authorization
 """
+import asyncio
 import pytest
+from unittest.mock import MagicMock, patch
 from httpx import AsyncClient
 from app.models.user import User
+from app.utils import auth
+
+
+@pytest.fixture
+def slow_user_lookup():
+    """Patch the current-user DB lookup to yield before querying"""
+    real_get_user_by_id = auth.UserService.get_user_by_id
+    
+    async def slow_get_user_by_id(db, user_id):
+        await asyncio.sleep(0.01)
+        return await real_get_user_by_id(db, user_id)
+    
+    with patch.object(
+        auth.UserService, "get_user_by_id", side_effect=slow_get_user_by_id
+    ) as mock_lookup:
+        yield mock_lookup
 
 
 class TestRegistration:
@@ -59,6 +77,26 @@ class TestRegistration:
         assert response.status_code == 400
         assert "already taken" in response.json()["detail"]
     
+    @pytest.mark.asyncio
+    async def test_register_email_and_username_held_by_different_users(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        test_admin: User
+    ):
+        """Test email conflict is reported when username belongs to another user"""
+        response = await client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": test_user.email,
+                "username": test_admin.username,
+                "password": "SecurePass123"
+            }
+        )
+        
+        assert response.status_code == 400
+        assert "already registered" in response.json()["detail"]
+    
     @pytest.mark.asyncio
     async def test_register_weak_password(self, client: AsyncClient):
         """Test registration with weak password"""
@@ -134,6 +172,31 @@ class TestLogin:
         assert response.status_code == 200
         data = response.json()
         assert "access_token" in data
+    
+    @pytest.mark.asyncio
+    async def test_login_upgrades_legacy_bcrypt_hash(
+        self,
+        client: AsyncClient,
+        db_session,
+        test_user: User
+    ):
+        """Test legacy bcrypt hashes still log in and are rehashed with Argon2id"""
+        import bcrypt
+        
+        test_user.hashed_password = bcrypt.hashpw(b"TestPass123", bcrypt.gensalt(rounds=4)).decode()
+        await db_session.flush()
+        
+        response = await client.post(
+            "/api/v1/auth/login",
+            data={
+                "username": "testuser",
+                "password": "TestPass123"
+            }
+        )
+        
+        assert response.status_code == 200
+        await db_session.refresh(test_user)
+        assert test_user.hashed_password.startswith("$argon2id$")
 
 
 class TestTokenRefresh:
@@ -195,9 +258,131 @@ class TestGetCurrentUser:
         assert data["email"] == test_user.email
         assert data["username"] == test_user.username
     
+    @pytest.mark.asyncio
+    async def test_get_current_user_reflects_update(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict
+    ):
+        """Test cached /me body is dropped when the user is updated"""
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.json()["username"] == test_user.username
+        
+        response = await client.put(
+            f"/api/v1/users/{test_user.id}",
+            headers=auth_headers,
+            json={"username": "renameduser"}
+        )
+        assert response.status_code == 200
+        
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.json()["username"] == "renameduser"
+    
     @pytest.mark.asyncio
     async def test_get_current_user_no_token(self, client: AsyncClient):
         """Test getting current user without token"""
         response = await client.get("/api/v1/auth/me")
         
         assert response.status_code == 401
+
+
+class TestTokenDecodeCache:
+    """Tests for the decoded JWT payload cache"""
+    
+    def test_valid_token_decoded_once(self, user_token: str):
+        """Test repeated decodes of a valid token skip verification"""
+        auth._JWT_CACHE.clear()
+        with patch.object(auth, "decode_token", wraps=auth.decode_token) as mock_decode:
+            first = auth.cached_decode_token(user_token)
+            second = auth.cached_decode_token(user_token)
+        
+        assert first is not None
+        assert second == first
+        mock_decode.assert_called_once()
+    
+    def test_invalid_token_not_cached(self):
+        """Test invalid tokens are never cached"""
+        auth._JWT_CACHE.clear()
+        
+        assert auth.cached_decode_token("invalid_token") is None
+        assert len(auth._JWT_CACHE) == 0
+
+
+class TestCurrentUserSingleFlight:
+    """Tests for coalescing concurrent current-user lookups"""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_query(
+        self,
+        db_session,
+        test_user: User,
+        slow_user_lookup: MagicMock
+    ):
+        """Test concurrent cache misses for one user issue a single lookup"""
+        users = await asyncio.gather(
+            *(auth.load_user_once(db_session, test_user.id) for _ in range(5))
+        )
+        
+        assert slow_user_lookup.call_count == 1
+        assert all(user.id == test_user.id for user in users)
+        assert not auth._INFLIGHT_USERS
+    
+    @pytest.mark.asyncio
+    async def test_waiters_retry_when_leader_cancelled(
+        self,
+        db_session,
+        test_user: User,
+        slow_user_lookup: MagicMock
+    ):
+        """Test cancelling the lookup's owner does not cancel its waiters"""
+        leader = asyncio.create_task(auth.load_user_once(db_session, test_user.id))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(auth.load_user_once(db_session, test_user.id))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        users = await asyncio.gather(*waiters)
+        
+        assert leader.cancelled()
+        assert slow_user_lookup.call_count == 2
+        assert all(user.id == test_user.id for user in users)
+        assert not auth._INFLIGHT_USERS
+
+
+class TestJWTMiddleware:
+    """Tests for bearer token decoding middleware"""
+    
+    @pytest.mark.asyncio
+    async def test_payload_stored_in_request_state(self, user_token: str, test_user: User):
+        """Test decoded payload is stored once for downstream dependencies"""
+        from app.utils.middleware import JWTMiddleware
+        from app.utils.auth import JWT_STATE_KEY
+        
+        seen = {}
+        
+        async def app(scope, receive, send):
+            seen.update(scope.get("state", {}))
+        
+        scope = {
+            "type": "http",
+            "headers": [(b"authorization", f"Bearer {user_token}".encode())]
+        }
+        await JWTMiddleware(app)(scope, None, None)
+        
+        assert seen[JWT_STATE_KEY]["sub"] == str(test_user.id)
+    
+    @pytest.mark.asyncio
+    async def test_request_without_bearer_token_untouched(self):
+        """Test requests without a bearer token get no payload in state"""
+        from app.utils.middleware import JWTMiddleware
+        
+        async def app(scope, receive, send):
+            pass
+        
+        scope = {"type": "http", "headers": [(b"authorization", b"Basic abc")]}
+        await JWTMiddleware(app)(scope, None, None)
+        
+        assert "state" not in scope
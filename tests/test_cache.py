@@ -3,9 +3,12 @@ Cache Tests
 Tests for Redis caching functionality
 """
 import pytest
-from unittest.mock import AsyncMock, patch
+from decimal import Decimal
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
 from app.cache.redis_client import RedisClient, redis_client
 from app.cache.cache_service import ProductCacheService, product_cache
+from app.cache.user_cache import UserCacheService
 
 
 class TestRedisClient:
@@ -67,12 +70,21 @@ class TestRedisClient:
         client = RedisClient()
         client._client = AsyncMock()
         client._connected = True  # Set connected flag
-        client._client.keys.return_value = ["key1", "key2", "key3"]
-        client._client.delete.return_value = 3
+        
+        async def scan_iter(match=None, count=None):
+            for key in ["key1", "key2", "key3"]:
+                yield key
+        
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[3])
+        client._client.scan_iter = scan_iter
+        client._client.pipeline = MagicMock(return_value=pipe)
         
         result = await client.delete_pattern("test:*")
         
         assert result == 3
+        pipe.unlink.assert_called_once_with("key1", "key2", "key3")
+        client._client.keys.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_exists(self):
@@ -95,48 +107,80 @@ class TestProductCacheService:
         """Test caching and retrieving product detail"""
         service = ProductCacheService()
         
-        with patch.object(redis_client, 'get', new_callable=AsyncMock) as mock_get, \
-             patch.object(redis_client, 'set', new_callable=AsyncMock) as mock_set:
+        with patch.object(redis_client, 'get_raw', new_callable=AsyncMock) as mock_get, \
+             patch.object(redis_client, 'set_raw', new_callable=AsyncMock) as mock_set:
             
-            product_data = {
-                "id": "test-id",
-                "name": "Test Product",
-                "price": 19.99
-            }
+            body = b'{"id":"test-id","name":"Test Product","price":"19.99"}'
             
             # Set product
-            await service.set_product_detail("test-id", product_data)
-            mock_set.assert_called_once()
+            await service.set_product_detail("test-id", body)
+            mock_set.assert_called_once_with("products:body:test-id", body)
             
             # Get product
-            mock_get.return_value = product_data
+            mock_get.return_value = body
             result = await service.get_product_detail("test-id")
             
-            assert result == product_data
+            assert result == body
     
     @pytest.mark.asyncio
     async def test_invalidate_product(self):
         """Test invalidating product cache"""
         service = ProductCacheService()
         
-        with patch.object(redis_client, 'delete', new_callable=AsyncMock) as mock_delete, \
+        pipe = MagicMock()
+        
+        @asynccontextmanager
+        async def fake_pipeline():
+            yield pipe
+        
+        with patch.object(redis_client, 'pipeline', fake_pipeline), \
              patch.object(redis_client, 'delete_pattern', new_callable=AsyncMock) as mock_delete_pattern:
             
-            mock_delete.return_value = True
-            mock_delete_pattern.return_value = 5
-            
             await service.invalidate_product("test-id")
             
-            # Should delete detail and all list/search caches
-            mock_delete.assert_called_once()
-            assert mock_delete_pattern.call_count == 2
+            # Should unlink detail and bump list/search generations in one pipeline
+            pipe.unlink.assert_called_once_with("products:body:test-id")
+            assert pipe.incr.call_count == 2
+            mock_delete_pattern.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_changes_list_key(self):
+        """Test list keys move to a new generation after invalidation"""
+        service = ProductCacheService()
+        
+        with patch.object(redis_client, 'get', new_callable=AsyncMock) as mock_get:
+            
+            mock_get.return_value = None
+            await service.get_product_list(1, 10)
+            assert mock_get.call_args_list[-1].args[0] == "products:list:0:1:10:all"
+            
+            await service.invalidate_all_lists()
+            mock_get.return_value = 1
+            await service.get_product_list(1, 10)
+            assert mock_get.call_args_list[-1].args[0] == "products:list:1:1:10:all"
+    
+    @pytest.mark.asyncio
+    async def test_product_count_cached_with_ttl(self):
+        """Test filtered counts are cached per list generation with a short TTL"""
+        service = ProductCacheService()
+        
+        with patch.object(redis_client, 'get', new_callable=AsyncMock) as mock_get, \
+             patch.object(redis_client, 'set', new_callable=AsyncMock) as mock_set:
+            
+            mock_get.return_value = None
+            await service.set_product_count(42, (None, "Books", None, None, False))
+            
+            key = mock_set.call_args.args[0]
+            assert key.startswith("products:count:0:")
+            assert mock_set.call_args.args[1] == 42
+            assert mock_set.call_args.kwargs["expire"] == ProductCacheService.COUNT_TTL
     
     @pytest.mark.asyncio
     async def test_hash_filters(self):
         """Test filter hashing"""
-        filters1 = {"category": "Electronics", "min_price": 10}
-        filters2 = {"category": "Electronics", "min_price": 10}
-        filters3 = {"category": "Books"}
+        filters1 = (None, "Electronics", Decimal("10"), None, False)
+        filters2 = (None, "Electronics", Decimal("10"), None, False)
+        filters3 = (None, "Books", None, None, False)
         
         hash1 = ProductCacheService._hash_filters(filters1)
         hash2 = ProductCacheService._hash_filters(filters2)
@@ -147,7 +191,11 @@ class TestProductCacheService:
         # Different filters should produce different hash
         assert hash1 != hash3
         # Empty filters should return "all"
-        assert ProductCacheService._hash_filters({}) == "all"
+        assert ProductCacheService._hash_filters(()) == "all"
+        # Non-cryptographic xxh3 digest of the encoded filters
+        import orjson
+        import xxhash
+        assert hash3 == xxhash.xxh3_64_hexdigest(orjson.dumps(filters3))
     
     @pytest.mark.asyncio
     async def test_cache_key_generation(self):
@@ -155,15 +203,102 @@ class TestProductCacheService:
         service = ProductCacheService()
         
         # List key
-        list_key = service._list_key(1, 10, "abc123")
-        assert list_key == "products:list:1:10:abc123"
+        list_key = service._list_key(3, 1, 10, "abc123")
+        assert list_key == "products:list:3:1:10:abc123"
         
         # Detail key
         detail_key = service._detail_key("product-uuid")
-        assert detail_key == "products:detail:product-uuid"
+        assert detail_key == "products:body:product-uuid"
         
         # Search key
-        import hashlib
-        query_hash = hashlib.md5("test query".encode()).hexdigest()[:8]
-        search_key = service._search_key("test query", 1, 10)
-        assert query_hash in search_key
\ No newline at end of file
+        import xxhash
+        query_hash = xxhash.xxh3_64_hexdigest("test query".encode())
+        search_key = service._search_key(3, "test query", 1, 10)
+        assert query_hash in search_key
+    
+    @pytest.mark.asyncio
+    async def test_cached_detail_returned_as_bytes(self):
+        """Test cached product details are served without a database query"""
+        from app.services.product_service import ProductService
+        
+        cached = b'{"id":"test-id","name":"Test Product","price":"19.99"}'
+        
+        with patch.object(product_cache, 'get_product_detail', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = cached
+            result = await ProductService.get_product_by_id(None, "test-id")
+        
+        assert result is cached
+    
+    @pytest.mark.asyncio
+    async def test_cached_list_returned_without_query(self):
+        """Test cached product lists are served without a database query"""
+        from app.models.schemas import PaginationParams
+        from app.services.product_service import ProductService
+        
+        cached = {
+            "items": [{"id": "test-id", "name": "Test Product"}],
+            "total": 1,
+            "page": 1,
+            "page_size": 10,
+            "total_pages": 1,
+            "next_cursor": None
+        }
+        
+        with patch.object(product_cache, 'get_product_list', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = cached
+            result = await ProductService.get_products(None, PaginationParams())
+        
+        assert result is cached
+
+
+class TestUserCacheService:
+    """Tests for current-user cache service"""
+    
+    @pytest.mark.asyncio
+    async def test_user_snapshot_round_trips_through_redis(self, test_user):
+        """Test a snapshot cached by one worker is served to another from Redis"""
+        writer = UserCacheService()
+        reader = UserCacheService()
+        
+        with patch.object(redis_client, 'get', new_callable=AsyncMock) as mock_get, \
+             patch.object(redis_client, 'set', new_callable=AsyncMock) as mock_set:
+            
+            snapshot = await writer.set_user(test_user)
+            key, data = mock_set.call_args.args
+            assert key == f"auth:user:{test_user.id}"
+            assert mock_set.call_args.kwargs["expire"] == UserCacheService.REDIS_TTL
+            
+            mock_get.return_value = data
+            result = await reader.get_user(test_user.id)
+        
+        assert result == snapshot
+    
+    @pytest.mark.asyncio
+    async def test_snapshot_from_redis_kept_only_for_its_remaining_ttl(self, test_user):
+        """Test a worker does not extend the life of a nearly expired Redis entry"""
+        import time
+        from app.cache.user_cache import UserSnapshot
+        
+        service = UserCacheService()
+        data = UserSnapshot.from_user(test_user).to_cache()
+        data["expires_at"] = time.time() + 1
+        
+        with patch.object(redis_client, 'get', new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = data
+            await service.get_user(test_user.id)
+        
+        service.set_response(test_user.id, b"{}")
+        
+        key = str(test_user.id)
+        assert 0 < service._users.ttl_left(key) <= 1
+        assert 0 < service._responses.ttl_left(key) <= 1
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_user_deletes_redis_entry(self):
+        """Test invalidation drops the shared Redis snapshot"""
+        service = UserCacheService()
+        
+        with patch.object(redis_client, 'delete', new_callable=AsyncMock) as mock_delete:
+            await service.invalidate_user("test-id")
+        
+        mock_delete.assert_called_once_with("auth:user:test-id")
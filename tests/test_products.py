@@ -2,6 +2,7 @@
 Product Tests
 Tests for CRUD operations, pagination, filtering, and sorting
 """
+import orjson
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
@@ -9,14 +10,31 @@ from decimal import Decimal
 from uuid import uuid4
 from app.models.user import User
 from app.models.product import Product
+from typing import Any, AsyncGenerator, Awaitable, Callable, Iterable
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-@pytest_asyncio.fixture
-async def test_products(db_session: AsyncSession) -> list[Product]:
-    """Create test products"""
+def _json(response) -> Any:
+    """Parse response body with orjson straight from the raw bytes"""
+    return orjson.loads(response.content)
+
+
+@pytest_asyncio.fixture(scope="module")
+async def test_products(
+    test_engine,
+    commit_rows: Callable[[Iterable[Any]], Awaitable[None]]
+) -> AsyncGenerator[list[Product], None]:
+    """
+    Create test products once for the module
+    
+    Unlike the seeded users, the products are deleted again when the module
+    finishes, so later modules start from an empty catalogue. Ids and
+    timestamps are assigned client-side, so no refresh is needed.
+    """
     products = [
         Product(
+            id=uuid4(),
             name="Product A",
             description="Description for product A",
             price=Decimal("19.99"),
@@ -25,6 +43,7 @@ async def test_products(db_session: AsyncSession) -> list[Product]:
             sku="SKU-A001"
         ),
         Product(
+            id=uuid4(),
             name="Product B",
             description="Description for product B",
             price=Decimal("29.99"),
@@ -33,6 +52,7 @@ async def test_products(db_session: AsyncSession) -> list[Product]:
             sku="SKU-B001"
         ),
         Product(
+            id=uuid4(),
             name="Product C",
             description="Description for product C",
             price=Decimal("9.99"),
@@ -42,15 +62,14 @@ async def test_products(db_session: AsyncSession) -> list[Product]:
         ),
     ]
     
-    for product in products:
-        db_session.add(product)
+    await commit_rows(products)
     
-    await db_session.commit()
+    yield products
     
-    for product in products:
-        await db_session.refresh(product)
-    
-    return products
+    async with test_engine.begin() as conn:
+        await conn.execute(
+            delete(Product).where(Product.id.in_([product.id for product in products]))
+        )
 
 
 class TestProductCreate:
@@ -124,11 +143,30 @@ class TestProductList:
         response = await client.get("/api/v1/products")
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert "items" in data
         assert "total" in data
         assert data["total"] >= 3
     
+    @pytest.mark.asyncio
+    async def test_get_products_not_modified(
+        self,
+        client: AsyncClient,
+        test_products: list[Product]
+    ):
+        """Test a matching ETag gets a header-only 304 for the list"""
+        response = await client.get("/api/v1/products")
+        etag = response.headers["etag"]
+        
+        response = await client.get(
+            "/api/v1/products",
+            headers={"If-None-Match": etag}
+        )
+        
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+    
     @pytest.mark.asyncio
     async def test_get_products_pagination(
         self,
@@ -141,57 +179,122 @@ class TestProductList:
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert len(data["items"]) <= 2
         assert data["page_size"] == 2
     
     @pytest.mark.asyncio
-    async def test_get_products_filter_by_category(
+    async def test_get_products_cursor_pagination(
         self,
         client: AsyncClient,
         test_products: list[Product]
     ):
+        """Test walking pages with next_cursor covers all products once"""
+        response = await client.get("/api/v1/products", params={"page_size": 2})
+        first = _json(response)
+        assert len(first["items"]) == 2
+        assert first["next_cursor"]
+        
         response = await client.get(
             "/api/v1/products",
-            params={"category": "Electronics"}
+            params={"page_size": 2, "cursor": first["next_cursor"]}
         )
         
         assert response.status_code == 200
-        data = response.json()
-        for item in data["items"]:
-            assert item["category"] == "Electronics"
+        second = _json(response)
+        assert len(second["items"]) == 1
+        assert second["total"] == 3
+        assert second["next_cursor"] is None
+        ids = {item["id"] for item in first["items"] + second["items"]}
+        assert ids == {str(p.id) for p in test_products}
+    
+    @pytest.mark.asyncio
+    async def test_get_products_invalid_cursor(self, client: AsyncClient):
+        """Test malformed cursors are rejected"""
+        response = await client.get("/api/v1/products", params={"cursor": "bogus"})
+        
+        assert response.status_code == 400
     
     @pytest.mark.asyncio
-    async def test_get_products_filter_by_price_range(
+    async def test_get_products_timezone_aware_cursor(self, client: AsyncClient):
+        """Test cursors with a UTC offset are rejected like other bad cursors"""
+        import base64
+        
+        cursor = base64.urlsafe_b64encode(
+            f"2024-01-01T00:00:00+05:00|{uuid4()}".encode()
+        ).decode()
+        response = await client.get("/api/v1/products", params={"cursor": cursor})
+        
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_get_products_cursor_with_page(
         self,
         client: AsyncClient,
         test_products: list[Product]
     ):
+        """Test a cursor cannot be combined with an explicit page"""
+        first = _json(await client.get("/api/v1/products", params={"page_size": 2}))
+        
         response = await client.get(
             "/api/v1/products",
-            params={"min_price": 15.00, "max_price": 30.00}
+            params={"page": 3, "page_size": 2, "cursor": first["next_cursor"]}
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        for item in data["items"]:
-            assert 15.00 <= float(item["price"]) <= 30.00
+        assert response.status_code == 400
     
     @pytest.mark.asyncio
-    async def test_get_products_filter_in_stock(
+    async def test_get_products_page_past_end_keeps_total(
         self,
         client: AsyncClient,
         test_products: list[Product]
     ):
+        """Test total is still reported when a page has no rows"""
         response = await client.get(
             "/api/v1/products",
-            params={"in_stock_only": True}
+            params={"page": 5, "page_size": 2}
         )
         
         assert response.status_code == 200
-        data = response.json()
-        for item in data["items"]:
-            assert item["stock"] > 0
+        data = _json(response)
+        assert data["items"] == []
+        assert data["total"] == 3
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "params,matches",
+        [
+            ({"category": "Electronics"}, lambda item: item["category"] == "Electronics"),
+            (
+                {"min_price": 15.00, "max_price": 30.00},
+                lambda item: 15.00 <= float(item["price"]) <= 30.00
+            ),
+            ({"in_stock_only": True}, lambda item: item["stock"] > 0),
+        ],
+        ids=["category", "price_range", "in_stock"]
+    )
+    async def test_get_products_filtered(
+        self,
+        client: AsyncClient,
+        test_products: list[Product],
+        params: dict,
+        matches
+    ):
+        """Test each filter returns only, and all, matching products"""
+        response = await client.get("/api/v1/products", params=params)
+        
+        assert response.status_code == 200
+        data = _json(response)
+        assert all(matches(item) for item in data["items"])
+        expected = [
+            product for product in test_products
+            if matches({
+                "category": product.category,
+                "price": product.price,
+                "stock": product.stock
+            })
+        ]
+        assert data["total"] == len(expected)
     
     @pytest.mark.asyncio
     async def test_get_products_sort_by_price(
@@ -205,7 +308,7 @@ class TestProductList:
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         if len(data["items"]) > 1:
             prices = [float(item["price"]) for item in data["items"]]
             assert prices == sorted(prices)
@@ -226,7 +329,7 @@ class TestProductSearch:
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert "items" in data
         assert data["total"] >= 1
     
@@ -242,7 +345,7 @@ class TestProductSearch:
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["total"] >= 1
 
 
@@ -268,6 +371,34 @@ class TestProductDetail:
         response = await client.get(f"/api/v1/products/{fake_id}")
         
         assert response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_get_product_not_modified(
+        self,
+        client: AsyncClient,
+        test_products: list[Product]
+    ):
+        """Test conditional GET returns 304 for a matching ETag"""
+        product = test_products[0]
+        response = await client.get(f"/api/v1/products/{product.id}")
+        
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "private, max-age=30"
+        
+        response = await client.get(
+            f"/api/v1/products/{product.id}",
+            headers={"If-None-Match": etag}
+        )
+        
+        assert response.status_code == 304
+        assert response.content == b""
+    
+    @pytest.mark.asyncio
+    async def test_get_product_malformed_id(self, client: AsyncClient):
+        """Test non-UUID ids are rejected before reaching the service"""
+        response = await client.get("/api/v1/products/not-a-uuid")
+        
+        assert response.status_code == 422
 
 
 class TestProductUpdate:
@@ -291,6 +422,32 @@ class TestProductUpdate:
         data = response.json()
         assert data["name"] == "Updated Product"
     
+    @pytest.mark.asyncio
+    async def test_update_product_already_loaded(
+        self,
+        client: AsyncClient,
+        db_session: AsyncSession,
+        test_products: list[Product],
+        admin_auth_headers: dict
+    ):
+        """Test the update returns new values for a product held in the session"""
+        product = await db_session.get(Product, test_products[1].id)
+        assert product.name == "Product B"
+        
+        response = await client.put(
+            f"/api/v1/products/{product.id}",
+            json={"name": "Loaded Product", "price": 39.99},
+            headers=admin_auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = _json(response)
+        assert data["name"] == "Loaded Product"
+        assert Decimal(str(data["price"])) == Decimal("39.99")
+        
+        response = await client.get(f"/api/v1/products/{product.id}")
+        assert _json(response)["name"] == "Loaded Product"
+    
     @pytest.mark.asyncio
     async def test_update_product_unauthorized(
         self,
@@ -3,14 +3,34 @@ RBAC Tests
 Tests for Role-Based Access Control
 """
 import pytest
+from decimal import Decimal
+from typing import Any, Awaitable, Callable
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.models.product import Product
 from uuid import uuid4
 
-def str_uuid():
-    """Generate string UUID for SQLite compatibility"""
-    return str(uuid4())
+_DEFAULT_PRICE = Decimal("10.00")
+
+
+@pytest.fixture
+def make_product(db_session: AsyncSession) -> Callable[..., Awaitable[Product]]:
+    """Factory creating a product visible to the app through the shared session"""
+    
+    async def _make_product(sku: str, **fields: Any) -> Product:
+        product = Product(
+            id=uuid4(),
+            name="Test Product",
+            price=_DEFAULT_PRICE,
+            sku=sku,
+            **fields
+        )
+        db_session.add(product)
+        await db_session.flush()
+        return product
+    
+    return _make_product
 
 
 class TestUserEndpointsRBAC:
@@ -30,6 +50,27 @@ class TestUserEndpointsRBAC:
         
         assert response.status_code == 200
     
+    @pytest.mark.asyncio
+    async def test_admin_list_users_paginated(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        admin_auth_headers: dict
+    ):
+        """Test user listing is paginated"""
+        response = await client.get(
+            "/api/v1/users",
+            params={"page": 1, "page_size": 1},
+            headers=admin_auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["total_pages"] == 2
+        assert len(data["items"]) == 1
+        assert "hashed_password" not in data["items"][0]
+    
     @pytest.mark.asyncio
     async def test_user_cannot_list_users(
         self,
@@ -94,12 +135,12 @@ class TestUserEndpointsRBAC:
     async def test_admin_can_delete_user(
         self,
         client: AsyncClient,
-        test_user: User,
+        disposable_user: User,
         admin_auth_headers: dict
     ):
         """Test admin can delete user"""
         response = await client.delete(
-            f"/api/v1/users/{test_user.id}",
+            f"/api/v1/users/{disposable_user.id}",
             headers=admin_auth_headers
         )
         
@@ -123,20 +164,10 @@ class TestProductEndpointsRBAC:
     async def test_anyone_can_view_product(
         self,
         client: AsyncClient,
-        db_session
+        make_product
     ):
         """Test anyone can view product detail"""
-        from decimal import Decimal
-        
-        product = Product(
-            id=str_uuid(),
-            name="Test Product",
-            price=Decimal("10.00"),
-            sku="TEST-SKU-001"
-        )
-        db_session.add(product)
-        await db_session.commit()
-        await db_session.refresh(product)
+        product = await make_product("TEST-SKU-001")
         
         response = await client.get(f"/api/v1/products/{product.id}")
         
@@ -185,20 +216,10 @@ class TestProductEndpointsRBAC:
         self,
         client: AsyncClient,
         admin_auth_headers: dict,
-        db_session
+        make_product
     ):
         """Test admin can update product"""
-        from decimal import Decimal
-        
-        product = Product(
-            id=str_uuid(),
-            name="Test Product",
-            price=Decimal("10.00"),
-            sku="TEST-SKU-004"
-        )
-        db_session.add(product)
-        await db_session.commit()
-        await db_session.refresh(product)
+        product = await make_product("TEST-SKU-004")
         
         response = await client.put(
             f"/api/v1/products/{product.id}",
@@ -213,20 +234,10 @@ class TestProductEndpointsRBAC:
         self,
         client: AsyncClient,
         auth_headers: dict,
-        db_session
+        make_product
     ):
         """Test regular user cannot update product"""
-        from decimal import Decimal
-        
-        product = Product(
-            id=str_uuid(),
-            name="Test Product",
-            price=Decimal("10.00"),
-            sku="TEST-SKU-005"
-        )
-        db_session.add(product)
-        await db_session.commit()
-        await db_session.refresh(product)
+        product = await make_product("TEST-SKU-005")
         
         response = await client.put(
             f"/api/v1/products/{product.id}",
@@ -241,20 +252,10 @@ class TestProductEndpointsRBAC:
         self,
         client: AsyncClient,
         admin_auth_headers: dict,
-        db_session
+        make_product
     ):
         """Test admin can delete product"""
-        from decimal import Decimal
-        
-        product = Product(
-            id=str_uuid(),
-            name="Test Product",
-            price=Decimal("10.00"),
-            sku="TEST-SKU-006"
-        )
-        db_session.add(product)
-        await db_session.commit()
-        await db_session.refresh(product)
+        product = await make_product("TEST-SKU-006")
         
         response = await client.delete(
             f"/api/v1/products/{product.id}",
@@ -271,29 +272,65 @@ class TestInactiveUser:
     async def test_inactive_user_cannot_login(
         self,
         client: AsyncClient,
-        db_session
+        db_session,
+        disposable_user: User
     ):
         """Test inactive user cannot login"""
-        from app.core.security import get_password_hash
-        from app.models.user import User, UserRole
-        
-        inactive_user = User(
-            id=str_uuid(),
-            email="inactive@example.com",
-            username="inactiveuser",
-            hashed_password=get_password_hash("TestPass123"),
-            role=UserRole.USER,
-            is_active=False
-        )
-        db_session.add(inactive_user)
-        await db_session.commit()
+        disposable_user.is_active = False
+        await db_session.flush()
         
         response = await client.post(
             "/api/v1/auth/login",
             data={
-                "username": "inactiveuser",
+                "username": disposable_user.username,
                 "password": "TestPass123"
             }
         )
         
-        assert response.status_code == 401
\ No newline at end of file
+        assert response.status_code == 401
+
+
+class TestAuthDependencyCaching:
+    """Tests for per-request auth dependency caching"""
+    
+    @pytest.mark.asyncio
+    async def test_admin_endpoint_loads_user_once(
+        self,
+        client: AsyncClient,
+        admin_auth_headers: dict
+    ):
+        """Test admin check reuses the current user resolved for the request"""
+        from unittest.mock import patch
+        from app.services.user_service import UserService
+        
+        with patch.object(
+            UserService, "get_user_by_id", wraps=UserService.get_user_by_id
+        ) as mock_get_user:
+            response = await client.get(
+                "/api/v1/users",
+                headers=admin_auth_headers
+            )
+        
+        assert response.status_code == 200
+        assert mock_get_user.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_deleted_user_token_rejected(
+        self,
+        client: AsyncClient,
+        test_user: User,
+        auth_headers: dict,
+        admin_auth_headers: dict
+    ):
+        """Test deleting a user drops their cached snapshot"""
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        
+        response = await client.delete(
+            f"/api/v1/users/{test_user.id}",
+            headers=admin_auth_headers
+        )
+        assert response.status_code == 204
+        
+        response = await client.get("/api/v1/auth/me", headers=auth_headers)
+        assert response.status_code == 401